@@ -7,6 +7,137 @@ class Settings(BaseSettings):
     GRPC_PORT: int = 50051
     HTTP_PORT: int = 5000
     LOG_LEVEL: str = "INFO"
+    # "console" or "json" lines on stdout. Under load, LOG_SAMPLE_RATE keeps
+    # the info lines of only that fraction of requests; warnings and errors
+    # are always written
+    LOG_FORMAT: str = "console"
+    LOG_SAMPLE_RATE: float = 1.0
+
+    # HTTP serving. WORKERS > 1 forks that many server processes sharing
+    # the port (0 = one per CPU); each has its own PDF worker pool. A worker
+    # is replaced after WORKER_MAX_REQUESTS requests (0 = never), give or
+    # take a random WORKER_MAX_REQUESTS_JITTER so they don't all restart at once
+    WORKERS: int = 1
+    WORKER_MAX_REQUESTS: int = 0
+    WORKER_MAX_REQUESTS_JITTER: int = 0
+    # a server worker whose resident memory passes this many MB finishes
+    # its in-flight requests and is replaced (0 = no limit)
+    WORKER_MAX_RSS_MB: int = 0
+    # seconds in-flight requests get to finish on shutdown
+    GRACEFUL_SHUTDOWN_TIMEOUT: float = 30.0
+    # state shared between workers: disk caches that aren't given their own
+    # directory and Prometheus metrics. A temporary directory is used when
+    # unset and more than one worker runs
+    SHARED_STATE_DIR: str = ""
+
+    # PDF extraction runs on a process pool; requests beyond
+    # PDF_WORKERS + PDF_QUEUE_SIZE are rejected with 503
+    PDF_WORKERS: int = 2
+    PDF_QUEUE_SIZE: int = 8
+    # documents with at least this many pages are split across workers
+    PDF_PARALLEL_MIN_PAGES: int = 8
+    # upload limits; larger uploads get a 413
+    PDF_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    PDF_MAX_PAGES: int = 100
+    # an extraction needing more than PDF_TASK_MEMORY_MB of heap fails with
+    # 413. Extraction processes are replaced after PDF_WORKER_MAX_TASKS
+    # documents or once one of them holds more than PDF_WORKER_MAX_RSS_MB
+    # (0 = no limit)
+    PDF_TASK_MEMORY_MB: int = 1024
+    PDF_WORKER_MAX_TASKS: int = 500
+    PDF_WORKER_MAX_RSS_MB: int = 512
+
+    # parsed resume text is cached by content hash; set PDF_CACHE_DIR to
+    # keep entries across restarts
+    PDF_CACHE_ENTRIES: int = 128
+    PDF_CACHE_TTL: int = 7 * 24 * 3600
+    PDF_CACHE_DIR: str = ""
+    PDF_CACHE_DIR_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # job scraping uses a pooled async HTTP client
+    SCRAPER_BASE_URL: str = "https://www.linkedin.com/jobs/view/"
+    SCRAPER_MAX_CONNECTIONS: int = 20
+    SCRAPER_MAX_CONNECTIONS_PER_HOST: int = 6
+    SCRAPER_TIMEOUT: float = 30.0
+    SCRAPER_MAX_RETRIES: int = 5
+    # BeautifulSoup backend; "lxml" parses several times faster when
+    # installed but may repair malformed markup differently
+    SCRAPER_HTML_PARSER: str = "html.parser"
+    # job pages larger than this, or with more elements, aren't parsed (422)
+    SCRAPER_MAX_PAGE_BYTES: int = 5 * 1024 * 1024
+    SCRAPER_MAX_ELEMENTS: int = 100000
+    # stop downloading a job page once the part received holds the
+    # description and organization fields; pages that need a fallback
+    # selector are still read in full
+    SCRAPER_INCREMENTAL_FETCH: bool = True
+    # outbound requests per second per host, 0 disables the limit
+    SCRAPER_RATE_LIMIT: float = 5.0
+    SCRAPER_RATE_LIMIT_BURST: int = 5
+    # after this many LinkedIn failures in a row (429/5xx/network errors)
+    # scrapes fail fast with 503 for SCRAPER_BREAKER_RESET seconds
+    SCRAPER_BREAKER_FAILURES: int = 5
+    SCRAPER_BREAKER_RESET: float = 30.0
+
+    # time budget per request; callers can send a smaller or larger one in
+    # the X-Request-Timeout-Ms header, up to REQUEST_TIMEOUT_MAX. The
+    # default stays under the 25 s timeout of the analysis service
+    REQUEST_TIMEOUT: float = 24.0
+    REQUEST_TIMEOUT_MAX: float = 120.0
+
+    # POST /scrape-jobs
+    SCRAPE_BATCH_CONCURRENCY: int = 8
+    SCRAPE_BATCH_MAX_JOBS: int = 500
+
+    # scrape results are cached per job ID; "no job content" answers are
+    # cached for the shorter negative TTL
+    JOB_CACHE_ENTRIES: int = 1024
+    JOB_CACHE_TTL: int = 3600
+    JOB_NEGATIVE_CACHE_TTL: int = 300
+    JOB_CACHE_DIR: str = ""
+
+    # asynchronous job API (/jobs): background work with at most this many
+    # jobs of each kind running at once
+    ASYNC_JOBS_PDF_CONCURRENCY: int = 2
+    ASYNC_JOBS_SCRAPE_CONCURRENCY: int = 4
+    ASYNC_JOBS_MAX_QUEUED: int = 1000
+    # uploads of queued PDF jobs are spooled to disk; past this many bytes
+    # in total new jobs get a 503
+    ASYNC_JOBS_MAX_QUEUED_BYTES: int = 512 * 1024 * 1024
+    # time budget of one job once it starts, and how long finished jobs
+    # and their results can be fetched
+    ASYNC_JOBS_TIMEOUT: float = 300.0
+    ASYNC_JOBS_RESULT_TTL: int = 3600
+    # job records are mirrored here so any worker can answer a poll
+    ASYNC_JOBS_DIR: str = ""
+    # callbackUrl has to use one of these schemes and name one of these
+    # hosts (comma separated; ".example.com" also allows its subdomains),
+    # and hosts resolving to private, loopback or link-local addresses are
+    # refused. No hosts turns callbacks off
+    ASYNC_JOBS_CALLBACK_HOSTS: str = ""
+    ASYNC_JOBS_CALLBACK_SCHEMES: str = "https"
+
+    # skill extraction (/extract-skills); an empty path uses the bundled
+    # app/data/skills.json. Edits to the file are picked up within
+    # SKILLS_RELOAD_INTERVAL seconds
+    SKILLS_DICTIONARY_PATH: str = ""
+    SKILLS_RELOAD_INTERVAL: float = 5.0
+    SKILLS_BATCH_MAX_DOCUMENTS: int = 100
+
+    # near-duplicate detection (/near-duplicates): SimHash fingerprints of
+    # scraped job descriptions and parsed resumes. Documents at most
+    # SIMILARITY_MAX_DISTANCE bits apart (of 64) count as duplicates
+    SIMILARITY_MAX_ENTRIES: int = 50000
+    SIMILARITY_MAX_DISTANCE: int = 5
+    # indexes are snapshotted here every SIMILARITY_SNAPSHOT_INTERVAL seconds
+    # and reloaded on start; empty keeps them in memory only
+    SIMILARITY_DIR: str = ""
+    SIMILARITY_SNAPSHOT_INTERVAL: float = 60.0
+
+    # responses of at least this many bytes are compressed for clients that
+    # accept zstd (needs the optional zstandard package) or gzip; 0 disables
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_ZSTD_LEVEL: int = 3
     
     class Config:
         env_file = ".env"
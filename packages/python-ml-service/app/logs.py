@@ -0,0 +1,137 @@
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+import structlog
+from .config import Settings
+
+# whether info and debug lines of the request being handled are written;
+# decided once per request so a sampled request keeps all of its lines
+_request_sampled = contextvars.ContextVar("log_request_sampled", default=True)
+
+_handler = None
+_listener = None
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hands records to the listener thread as they are.
+
+    The stock QueueHandler formats each record before queueing it, i.e. on
+    the calling thread; everything here stays in one process, so the
+    message, arguments and traceback can be rendered by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Drops info and debug lines of requests that weren't sampled"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _request_sampled.get()
+
+def sample_request(rate: float) -> contextvars.Token:
+    """Decide for the current request whether its info lines are written.
+
+    Returns a token for ``end_request``.
+    """
+    return _request_sampled.set(rate >= 1 or random.random() < rate)
+
+def end_request(token: contextvars.Token):
+    _request_sampled.reset(token)
+
+def _capture_exc_info(logger, method_name: str, event_dict: dict) -> dict:
+    # the listener thread renders tracebacks, and by then sys.exc_info()
+    # no longer refers to the exception being logged
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+def _record_fields(logger, method_name: str, event_dict: dict) -> dict:
+    record = event_dict["_record"]
+    event_dict["timestamp"] = datetime.fromtimestamp(record.created).isoformat(sep=" ", timespec="milliseconds")
+    event_dict["level"] = record.levelname.lower()
+    event_dict["logger"] = record.name
+    return event_dict
+
+def configure_logging(settings: Settings):
+    """Route structlog and stdlib logging through one background writer.
+
+    Callers only build an event dict and put it on a queue; a listener
+    thread renders it (as JSON with LOG_FORMAT=json) and writes to stdout,
+    so a slow stdout never blocks a request. Calls below LOG_LEVEL return
+    before doing any work.
+    """
+    global _handler
+    level = logging.getLevelName(settings.LOG_LEVEL.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown LOG_LEVEL: {settings.LOG_LEVEL}")
+
+    if settings.LOG_FORMAT == "json":
+        renderers = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+    else:
+        renderers = [structlog.dev.ConsoleRenderer(colors=False)]
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[_record_fields, structlog.stdlib.ProcessorFormatter.remove_processors_meta, *renderers]
+    ))
+
+    flush_logging()
+    _handler = _DeferredQueueHandler(queue.SimpleQueue())
+    _handler.addFilter(SamplingFilter())
+    _start_listener(output)
+
+    # lines show the time, level and logger only, so skip the caller lookup
+    # (a stack walk per call) and the process and thread bookkeeping
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(level)
+    # uvicorn's loggers write to the same queue instead of their own handlers
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
+    )
+
+def _start_listener(output: logging.Handler):
+    global _listener
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+def _restart_in_child():
+    # a forked server worker inherits the queue but not the listener thread
+    global _listener
+    if _listener is None:
+        return
+    output = _listener.handlers[0]
+    _handler.queue = queue.SimpleQueue()
+    _listener = None
+    _start_listener(output)
+
+def flush_logging():
+    """Write out queued lines; call before a process exits without atexit"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+os.register_at_fork(after_in_child=_restart_in_child)
+atexit.register(flush_logging)
@@ -1,52 +1,99 @@
 import os
 import asyncio
+import tempfile
 import uvicorn
 import structlog
-import logging
 import sys
-from .server.http_server import create_app
+from .config import Settings, get_settings
+from .logs import configure_logging
 
 logger = structlog.get_logger()
 
-HTTP_PORT = int(os.getenv("HTTP_PORT", "5000"))
-
-def configure_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
-    
-    # Set all loggers to at least INFO level
-    for logger_name in logging.root.manager.loggerDict:
-        logger_obj = logging.getLogger(logger_name)
-        logger_obj.setLevel(logging.INFO)
-
 def get_app():
+    # imported here so multi-worker setup can run before app.metrics loads
+    from .server.http_server import create_app
     return create_app()
 
-async def start_server():
-    configure_logging()
-    logger.info(f"Starting server on port {HTTP_PORT}")
+def prepare_shared_state(settings: Settings) -> Settings:
+    """Give all workers one directory for disk caches, job records and metrics.
+
+    Has to run before anything imports app.metrics, because prometheus_client
+    chooses its multiprocess mode when it is imported.
+    """
+    shared_dir = settings.SHARED_STATE_DIR or tempfile.mkdtemp(prefix="ml-service-")
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.path.join(shared_dir, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    # samples left by an earlier run would be added to this one's
+    for name in os.listdir(metrics_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(metrics_dir, name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    if not settings.PDF_CACHE_DIR:
+        os.environ["PDF_CACHE_DIR"] = os.path.join(shared_dir, "pdf-cache")
+    if not settings.JOB_CACHE_DIR:
+        os.environ["JOB_CACHE_DIR"] = os.path.join(shared_dir, "job-cache")
+    if not settings.ASYNC_JOBS_DIR:
+        os.environ["ASYNC_JOBS_DIR"] = os.path.join(shared_dir, "async-jobs")
+    if not settings.SIMILARITY_DIR:
+        os.environ["SIMILARITY_DIR"] = os.path.join(shared_dir, "similarity")
+    get_settings.cache_clear()
+    return get_settings()
+
+async def start_server(settings: Settings):
+    logger.info("Starting server", port=settings.HTTP_PORT)
     
     try:
         app = get_app()
         config = uvicorn.Config(
             app,
             host="0.0.0.0",
-            port=HTTP_PORT,
-            log_level="info"
+            port=settings.HTTP_PORT,
+            log_level=settings.LOG_LEVEL.lower(),
+            # keep uvicorn on the handlers configure_logging() installed
+            log_config=None,
+            timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT
         )
         
         server = uvicorn.Server(config)
         await server.serve()
     except Exception as e:
-        logger.error(f"Server error: {str(e)}", exc_info=True)
+        logger.error("Server error", error=str(e), exc_info=True)
         sys.exit(1)
 
+def start_workers(settings: Settings, workers: int):
+    settings = prepare_shared_state(settings)
+
+    # load pdfminer, bs4 and FastAPI once, before forking
+    from .server import http_server  # noqa: F401
+    from .server.supervisor import Supervisor
+
+    supervisor = Supervisor(
+        get_app,
+        host="0.0.0.0",
+        port=settings.HTTP_PORT,
+        workers=workers,
+        max_requests=settings.WORKER_MAX_REQUESTS,
+        max_requests_jitter=settings.WORKER_MAX_REQUESTS_JITTER,
+        graceful_timeout=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        log_level=settings.LOG_LEVEL.lower(),
+        max_rss=settings.WORKER_MAX_RSS_MB << 20
+    )
+    sys.exit(supervisor.run())
+
 def main():
-    logger.info("Starting Python ML service", http_port=HTTP_PORT)
-    asyncio.run(start_server())
+    settings = get_settings()
+    configure_logging(settings)
+    workers = settings.WORKERS or os.cpu_count() or 1
+    logger.info("Starting Python ML service", http_port=settings.HTTP_PORT, workers=workers)
+
+    # a supervisor is also needed for one worker that gets recycled
+    if workers > 1 or settings.WORKER_MAX_REQUESTS or settings.WORKER_MAX_RSS_MB:
+        if hasattr(os, "fork"):
+            start_workers(settings, workers)
+            return
+        logger.warning("Multiple workers need os.fork, serving from a single process")
+    asyncio.run(start_server(settings))
 
 if __name__ == "__main__":
     main()
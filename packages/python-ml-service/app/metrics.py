@@ -0,0 +1,192 @@
+import os
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# With several server workers (see app.server.supervisor) PROMETHEUS_MULTIPROC_DIR
+# is set before this module is imported, and the metrics below are written to
+# files there so any worker can report the totals of all of them.
+
+# Stage names used with STAGE_SECONDS:
+#   scrape_fetch            LinkedIn request, retries included
+#   scrape_retry_backoff    time slept between LinkedIn retries
+#   scrape_parse            whole HTML extraction (tree build + lookups)
+#   scrape_selectors        single-pass selector walk over the parsed tree
+#   scrape_fallback         alternative description search
+#   pdf_layout              pdfminer work in the pool, queueing included
+#   pdf_retry_backoff       time slept between PDF extraction retries
+STAGE_SECONDS = Histogram(
+    "ml_service_stage_duration_seconds",
+    "Time spent in each processing stage",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+RETRIES = Counter(
+    "ml_service_retries_total",
+    "Retried attempts per operation",
+    ["operation"]
+)
+
+PAYLOAD_BYTES = Histogram(
+    "ml_service_payload_size_bytes",
+    "Size of inputs handled by the service",
+    ["kind"],
+    buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7)
+)
+
+REQUEST_SECONDS = Histogram(
+    "ml_service_http_request_duration_seconds",
+    "HTTP request latency until the response starts",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "ml_service_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum"
+)
+
+# memory use of one task: peak RSS of the PDF worker while it ran the task,
+# or how much the server process grew while parsing a job page (approximate,
+# other requests run alongside)
+TASK_MEMORY_BYTES = Histogram(
+    "ml_service_task_memory_bytes",
+    "Memory used by one extraction task",
+    ["pool"],
+    buckets=(16e6, 32e6, 64e6, 128e6, 256e6, 512e6, 1e9, 2e9, 4e9)
+)
+
+LIMIT_REJECTIONS = Counter(
+    "ml_service_limit_rejections_total",
+    "Inputs aborted at a size, page, element or memory ceiling",
+    ["kind", "limit"]
+)
+
+# "partial" when a job page download stopped once the job data was found
+JOB_PAGE_READS = Counter(
+    "ml_service_job_page_reads_total",
+    "Job pages downloaded, by how much of the page was read",
+    ["read"]
+)
+
+# pool is "server" for HTTP workers restarted by the supervisor
+RECYCLES = Counter(
+    "ml_service_worker_recycles_total",
+    "Worker processes or pools replaced, by reason",
+    ["pool", "reason"]
+)
+
+def stage(name: str):
+    """Histogram child for a stage; use as ``with stage("scrape_fetch").time():``"""
+    return STAGE_SECONDS.labels(stage=name)
+
+class ServiceCollector:
+    """Reads worker pool and cache counters when /metrics is scraped, so the
+    hot path doesn't pay for them"""
+
+    def __init__(self):
+        # keyed by name, so an app rebuilt in the same process replaces its
+        # old pools and caches instead of reporting them twice
+        self.pools = {}
+        self.caches = {}
+        self.breakers = {}
+        self.scheduler = None
+        self.similarity = {}
+
+    def track_pool(self, pool):
+        self.pools[pool.name] = pool
+
+    def track_cache(self, cache):
+        self.caches[cache.name] = cache
+
+    def track_breaker(self, breaker):
+        self.breakers[breaker.name] = breaker
+
+    def track_scheduler(self, scheduler):
+        self.scheduler = scheduler
+
+    def track_similarity(self, index):
+        self.similarity[index.name] = index
+
+    def collect(self):
+        in_flight = GaugeMetricFamily(
+            "ml_service_pool_tasks_in_flight", "Admitted tasks per worker pool, running or queued", labels=["pool"]
+        )
+        queued = GaugeMetricFamily(
+            "ml_service_pool_queue_depth", "Tasks waiting for a free worker", labels=["pool"]
+        )
+        for pool in self.pools.values():
+            in_flight.add_metric([pool.name], pool.in_flight)
+            queued.add_metric([pool.name], pool.queued)
+
+        lookups = CounterMetricFamily(
+            "ml_service_cache_lookups", "Cache lookups by result", labels=["cache", "result"]
+        )
+        hit_ratio = GaugeMetricFamily(
+            "ml_service_cache_hit_ratio", "Hits over lookups since start", labels=["cache"]
+        )
+        entries = GaugeMetricFamily(
+            "ml_service_cache_entries", "Entries held in memory", labels=["cache"]
+        )
+        for cache in self.caches.values():
+            stats = cache.stats()
+            lookups.add_metric([cache.name, "hit"], stats["hits"])
+            lookups.add_metric([cache.name, "miss"], stats["misses"])
+            hit_ratio.add_metric([cache.name], stats["hit_ratio"])
+            entries.add_metric([cache.name], stats["entries"])
+
+        state = GaugeMetricFamily(
+            "ml_service_circuit_state", "1 for the current state of each circuit breaker", labels=["circuit", "state"]
+        )
+        rejected = CounterMetricFamily(
+            "ml_service_circuit_rejected", "Calls failed fast by an open circuit", labels=["circuit"]
+        )
+        for breaker in self.breakers.values():
+            for name in (breaker.CLOSED, breaker.OPEN, breaker.HALF_OPEN):
+                state.add_metric([breaker.name, name], 1 if breaker.state == name else 0)
+            rejected.add_metric([breaker.name], breaker.rejected)
+
+        jobs = GaugeMetricFamily(
+            "ml_service_async_jobs", "Background jobs waiting or running", labels=["kind", "state"]
+        )
+        if self.scheduler is not None:
+            for kind in self.scheduler.concurrency:
+                jobs.add_metric([kind, "queued"], self.scheduler.queued(kind))
+                jobs.add_metric([kind, "running"], self.scheduler.running(kind))
+
+        fingerprints = GaugeMetricFamily(
+            "ml_service_similarity_entries", "Documents in each near-duplicate index", labels=["index"]
+        )
+        for index in self.similarity.values():
+            fingerprints.add_metric([index.name], len(index))
+
+        yield from (in_flight, queued, lookups, hit_ratio, entries, state, rejected, jobs, fingerprints)
+
+class WorkerLabelled:
+    """Adds a ``worker`` label to another collector's samples"""
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def collect(self):
+        worker = str(os.getpid())
+        for family in self.collector.collect():
+            family.samples = [
+                sample._replace(labels={**sample.labels, "worker": worker}) for sample in family.samples
+            ]
+            yield family
+
+service_collector = ServiceCollector()
+REGISTRY.register(service_collector)
+
+def render_metrics():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # totals merged from every worker's files, plus the live pool, cache
+        # and circuit readings of the worker answering this scrape
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(WorkerLabelled(service_collector))
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,121 @@
+import asyncio
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import zstandard
+except ImportError:
+    # optional install; without it only gzip is offered
+    zstandard = None
+
+# bodies this large are compressed off the event loop
+THREAD_MIN_BYTES = 256 * 1024
+
+def accepted_encodings(header: str) -> List[str]:
+    """Codings from an Accept-Encoding header that aren't refused with q=0"""
+    codings = []
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            codings.append(coding)
+    return codings
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, chunk: bytes, final: bool) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class _ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def encode(self, chunk: bytes, final: bool) -> bytes:
+        flush = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(chunk) + self._compressor.flush(flush)
+
+class CompressionMiddleware:
+    """Compresses response bodies with zstd or gzip, whichever the client
+    accepts (zstd first).
+
+    Bodies smaller than ``minimum_size`` are sent as they are. Streamed
+    responses are compressed chunk by chunk and flushed after each one, so
+    NDJSON lines still reach the client as they are produced.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level}
+        if zstandard is not None:
+            self.levels["zstd"] = zstd_level
+
+    def _encoder(self, scope) -> Optional[type]:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoder in (_ZstdEncoder, _GzipEncoder):
+            if encoder.name in self.levels and encoder.name in accepted:
+                return encoder
+        return None
+
+    async def __call__(self, scope, receive, send):
+        encoder_class = self._encoder(scope) if scope["type"] == "http" else None
+        if encoder_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                passthrough = True
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(scope=start)
+                headers.add_vary_header("Accept-Encoding")
+                if "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = encoder_class(self.levels[encoder_class.name])
+                headers["Content-Encoding"] = encoder.name
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+
+            if len(body) >= THREAD_MIN_BYTES:
+                body = await asyncio.to_thread(encoder.encode, body, not more_body)
+            else:
+                body = encoder.encode(body, not more_body)
+            if start is not None:
+                if not more_body:
+                    MutableHeaders(scope=start)["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
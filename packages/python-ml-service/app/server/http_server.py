@@ -1,17 +1,165 @@
-from fastapi import FastAPI, UploadFile, HTTPException, File
+from fastapi import FastAPI, UploadFile, HTTPException, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from ..services.pdf_service import PDFService
-from ..services.job_scraper import JobScraper
-import logging
-import traceback
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from ..config import get_settings
+from ..services.pdf_service import (
+    PDFService, PDFException, PDFLimitError, PDFTransientError, EXTRACTION_PROFILES, DEFAULT_PROFILE, parse_page_range,
+    document_key
+)
+from ..services.job_scraper import JobScraper, JobNotFoundError, JobPageLimitError
+from ..services.worker_pool import PoolSaturatedError
+from ..services.result_cache import ResultCache
+from ..services.resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded
+from ..services.skill_extractor import SkillExtractor, SkillDictionaryError, DEFAULT_DICTIONARY
+from ..services.similarity_index import SimilarityIndex, BITS, simhash
+from ..services.job_queue import (
+    JobScheduler, JobFailedError, JobQueueFullError, JobNotCancellableError, CallbackPolicy, CallbackURLError, PRIORITIES
+)
+from .compression import CompressionMiddleware
+from .responses import FastJSONResponse, ndjson_line, parse_fields, select_fields, JOB_FIELDS, PDF_FIELDS
+from ..logs import sample_request, end_request
+from ..metrics import PAYLOAD_BYTES, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, render_metrics, service_collector
+from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import contextlib
+import math
+import os
+import structlog
+import time
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+class ScrapeJobsRequest(BaseModel):
+    jobIds: List[str]
+
+class ExtractSkillsRequest(BaseModel):
+    text: str
+
+class ExtractSkillsBatchRequest(BaseModel):
+    texts: List[str]
+
+class NearDuplicatesRequest(BaseModel):
+    kind: str
+    text: str
+    key: Optional[str] = None
+    add: bool = False
 
 def create_app() -> FastAPI:
-    app = FastAPI()
-    pdf_service = PDFService()
-    job_scraper = JobScraper()
+    settings = get_settings()
+
+    def similarity_index(name: str) -> SimilarityIndex:
+        return SimilarityIndex(
+            name,
+            max_entries=settings.SIMILARITY_MAX_ENTRIES,
+            max_distance=settings.SIMILARITY_MAX_DISTANCE,
+            snapshot_path=os.path.join(settings.SIMILARITY_DIR, f"{name}.json") if settings.SIMILARITY_DIR else None
+        )
+
+    # scraped job descriptions by job ID, parsed resumes by document_key()
+    similarity = {"jobs": similarity_index("jobs"), "resumes": similarity_index("resumes")}
+    pdf_service = PDFService(
+        max_workers=settings.PDF_WORKERS,
+        max_queue=settings.PDF_QUEUE_SIZE,
+        cache=ResultCache(
+            "pdf",
+            max_entries=settings.PDF_CACHE_ENTRIES,
+            ttl=settings.PDF_CACHE_TTL,
+            disk_dir=settings.PDF_CACHE_DIR or None,
+            disk_max_bytes=settings.PDF_CACHE_DIR_MAX_BYTES
+        ),
+        max_upload_bytes=settings.PDF_MAX_UPLOAD_BYTES,
+        max_pages=settings.PDF_MAX_PAGES,
+        parallel_min_pages=settings.PDF_PARALLEL_MIN_PAGES,
+        similarity=similarity["resumes"],
+        max_tasks_per_worker=settings.PDF_WORKER_MAX_TASKS,
+        task_memory_limit=settings.PDF_TASK_MEMORY_MB << 20,
+        max_worker_rss=settings.PDF_WORKER_MAX_RSS_MB << 20
+    )
+    job_scraper = JobScraper(
+        base_url=settings.SCRAPER_BASE_URL,
+        max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+        max_connections_per_host=settings.SCRAPER_MAX_CONNECTIONS_PER_HOST,
+        timeout=settings.SCRAPER_TIMEOUT,
+        max_retries=settings.SCRAPER_MAX_RETRIES,
+        cache=ResultCache(
+            "jobs",
+            max_entries=settings.JOB_CACHE_ENTRIES,
+            ttl=settings.JOB_CACHE_TTL,
+            disk_dir=settings.JOB_CACHE_DIR or None
+        ),
+        negative_ttl=settings.JOB_NEGATIVE_CACHE_TTL,
+        rate_limit=settings.SCRAPER_RATE_LIMIT,
+        rate_limit_burst=settings.SCRAPER_RATE_LIMIT_BURST,
+        parser=settings.SCRAPER_HTML_PARSER,
+        max_page_bytes=settings.SCRAPER_MAX_PAGE_BYTES,
+        max_elements=settings.SCRAPER_MAX_ELEMENTS,
+        incremental=settings.SCRAPER_INCREMENTAL_FETCH,
+        breaker=CircuitBreaker(
+            "linkedin",
+            failure_threshold=settings.SCRAPER_BREAKER_FAILURES,
+            reset_timeout=settings.SCRAPER_BREAKER_RESET
+        ),
+        similarity=similarity["jobs"]
+    )
+
+    service_collector.track_pool(pdf_service.pool)
+    service_collector.track_cache(pdf_service.cache)
+    service_collector.track_cache(job_scraper.cache)
+    skill_extractor = SkillExtractor(
+        settings.SKILLS_DICTIONARY_PATH or DEFAULT_DICTIONARY,
+        check_interval=settings.SKILLS_RELOAD_INTERVAL
+    )
+    scheduler = JobScheduler(
+        concurrency={
+            "parse-pdf": settings.ASYNC_JOBS_PDF_CONCURRENCY,
+            "scrape-job": settings.ASYNC_JOBS_SCRAPE_CONCURRENCY,
+        },
+        max_queued=settings.ASYNC_JOBS_MAX_QUEUED,
+        max_queued_bytes=settings.ASYNC_JOBS_MAX_QUEUED_BYTES,
+        result_ttl=settings.ASYNC_JOBS_RESULT_TTL,
+        callback_policy=CallbackPolicy(
+            hosts=[host.strip() for host in settings.ASYNC_JOBS_CALLBACK_HOSTS.split(",") if host.strip()],
+            schemes=[scheme.strip() for scheme in settings.ASYNC_JOBS_CALLBACK_SCHEMES.split(",") if scheme.strip()]
+        ),
+        # disk only: a record cached in one worker's memory would go stale
+        store=ResultCache(
+            "async-jobs",
+            max_entries=0,
+            ttl=settings.ASYNC_JOBS_RESULT_TTL,
+            disk_dir=settings.ASYNC_JOBS_DIR
+        ) if settings.ASYNC_JOBS_DIR else None
+    )
+
+    service_collector.track_breaker(job_scraper.breaker)
+    service_collector.track_scheduler(scheduler)
+    for index in similarity.values():
+        service_collector.track_similarity(index)
+
+    async def sync_similarity():
+        # documents indexed by other workers show up here within one interval
+        while True:
+            await asyncio.sleep(settings.SIMILARITY_SNAPSHOT_INTERVAL)
+            for index in similarity.values():
+                await asyncio.to_thread(index.sync)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        snapshots = asyncio.ensure_future(sync_similarity()) if settings.SIMILARITY_DIR else None
+        yield
+        if snapshots is not None:
+            snapshots.cancel()
+        for index in similarity.values():
+            index.sync()
+        await scheduler.close()
+        pdf_service.shutdown()
+        await job_scraper.close()
+
+    # route results are encoded with orjson; error bodies are small and
+    # keep the stock JSONResponse
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
     
-    logger = logging.getLogger(__name__)
+    logger = structlog.get_logger(__name__)
     
     app.add_middleware(
         CORSMiddleware,
@@ -20,50 +168,256 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+            gzip_level=settings.RESPONSE_GZIP_LEVEL,
+            zstd_level=settings.RESPONSE_ZSTD_LEVEL
+        )
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        REQUESTS_IN_FLIGHT.inc()
+        sampling = sample_request(settings.LOG_SAMPLE_RATE)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            end_request(sampling)
+            REQUESTS_IN_FLIGHT.dec()
+            # label by route template so path parameters can't explode cardinality
+            route = request.scope.get("route")
+            REQUEST_SECONDS.labels(
+                method=request.method,
+                route=route.path if route else "unmatched",
+                status=status
+            ).observe(time.perf_counter() - started)
+
+    def request_deadline(request: Request) -> Deadline:
+        return Deadline.from_headers(request.headers, settings.REQUEST_TIMEOUT, settings.REQUEST_TIMEOUT_MAX)
+
+    def deadline_exceeded(e: DeadlineExceeded):
+        logger.warning("Request deadline exceeded", error=str(e))
+        return JSONResponse(status_code=504, content={"error": "Request deadline exceeded"})
+
+    def circuit_open(e: CircuitOpenError):
+        logger.warning("Failing fast", error=str(e))
+        return JSONResponse(
+            status_code=503,
+            content={"error": "LinkedIn is unavailable, retry later"},
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+
+    def duplicate_matches(index: SimilarityIndex, fingerprint: int, exclude: Optional[str] = None):
+        return [
+            {"key": key, "distance": distance, "similarity": round(1 - distance / BITS, 3)}
+            for key, distance in index.query(fingerprint, exclude=exclude)
+        ]
+
+    async def find_duplicates(index: SimilarityIndex, key: str, text: str):
+        # fingerprinted already unless the text came from a cache
+        fingerprint = index.fingerprint_of(key)
+        if fingerprint is None:
+            fingerprint = await asyncio.to_thread(simhash, text)
+        return {"key": key, "matches": duplicate_matches(index, fingerprint, exclude=key)}
+
+    def invalid_fields(e: ValueError):
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    def invalid_pdf_options(profile: str, pages: Optional[str]):
+        if profile not in EXTRACTION_PROFILES:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"Unknown profile, expected one of: {', '.join(EXTRACTION_PROFILES)}"}
+            )
+        try:
+            parse_page_range(pages)
+        except PDFException as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        return None
 
     @app.get("/health")
     async def health_check():
         return {"status": "healthy"}
 
+    @app.get("/metrics")
+    async def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
     @app.post("/parse-pdf")
-    async def parse_pdf(file: UploadFile = File(...)):
+    async def parse_pdf(
+        request: Request,
+        file: UploadFile = File(...),
+        profile: str = DEFAULT_PROFILE,
+        pages: Optional[str] = None,
+        skills: bool = False,
+        duplicates: bool = False,
+        fields: Optional[str] = None
+    ):
+        deadline = request_deadline(request)
         if not file.filename.endswith('.pdf'):
             raise HTTPException(400, "File must be a PDF")
+        invalid = invalid_pdf_options(profile, pages)
+        if invalid:
+            return invalid
+        try:
+            selected = parse_fields(fields, PDF_FIELDS)
+        except ValueError as e:
+            return invalid_fields(e)
         
         content = await file.read()
-        text = await pdf_service.extract_text(content)
+        PAYLOAD_BYTES.labels(kind="pdf_upload").observe(len(content))
+        try:
+            text = await pdf_service.extract_text(content, profile=profile, pages=pages, deadline=deadline)
+        except PoolSaturatedError as e:
+            logger.warning("Rejecting PDF upload", error=str(e))
+            return JSONResponse(
+                status_code=503,
+                content={"error": "PDF service is busy, retry later"},
+                headers={"Retry-After": "1"}
+            )
+        except DeadlineExceeded as e:
+            return deadline_exceeded(e)
+        except PDFTransientError as e:
+            return JSONResponse(status_code=503, content={"error": str(e)}, headers={"Retry-After": "1"})
+        except PDFLimitError as e:
+            return JSONResponse(status_code=413, content={"error": str(e)})
+        except PDFException as e:
+            # the same upload would fail the same way again
+            return JSONResponse(status_code=422, content={"error": str(e)})
         
-        return {
+        response = {
             "text": text
         }
+        if skills:
+            response["skills"] = await asyncio.to_thread(skill_extractor.extract, text)
+        if duplicates:
+            response["duplicates"] = await find_duplicates(similarity["resumes"], document_key(content), text)
+        return select_fields(response, selected)
+
+    @app.post("/parse-pdf/stream")
+    async def parse_pdf_stream(file: UploadFile = File(...), profile: str = DEFAULT_PROFILE, pages: Optional[str] = None):
+        if not file.filename.endswith('.pdf'):
+            raise HTTPException(400, "File must be a PDF")
+        invalid = invalid_pdf_options(profile, pages)
+        if invalid:
+            return invalid
+
+        path = None
+        try:
+            path = await pdf_service.spool(file.read)
+            PAYLOAD_BYTES.labels(kind="pdf_upload").observe(os.path.getsize(path))
+            page_count = await pdf_service.count_pages(path)
+        except PoolSaturatedError as e:
+            logger.warning("Rejecting PDF upload", error=str(e))
+            error = JSONResponse(
+                status_code=503,
+                content={"error": "PDF service is busy, retry later"},
+                headers={"Retry-After": "1"}
+            )
+        except PDFLimitError as e:
+            error = JSONResponse(status_code=413, content={"error": str(e)})
+        except PDFException as e:
+            error = JSONResponse(status_code=422, content={"error": str(e)})
+        else:
+            error = None
+
+        if error is not None:
+            if path:
+                os.remove(path)
+            return error
+
+        logger.info("Streaming PDF text", pages=page_count)
+
+        def remove_upload():
+            # runs from the body iterator and again once the response ends;
+            # the response may also end before the iterator ever starts
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+        async def stream_pages():
+            # one line per page as it is laid out, then a summary line
+            try:
+                has_text = False
+                async for page, text in pdf_service.iter_pages(path, page_count, profile=profile, page_range=pages):
+                    has_text = has_text or bool(text)
+                    yield ndjson_line({"page": page, "text": text})
+                if has_text:
+                    yield ndjson_line({"done": True, "pages": page_count})
+                else:
+                    yield ndjson_line({"error": "No text content extracted from PDF"})
+            except PDFException as e:
+                yield ndjson_line({"error": str(e)})
+            finally:
+                remove_upload()
+
+        return StreamingResponse(
+            stream_pages(), media_type="application/x-ndjson", background=BackgroundTask(remove_upload)
+        )
 
     @app.get("/scrape-job")
-    async def scrape_job(jobId: str):
+    async def scrape_job(
+        request: Request,
+        jobId: str,
+        skills: bool = False,
+        duplicates: bool = False,
+        fields: Optional[str] = None
+    ):
         if not jobId:
             logger.error("Missing jobId parameter")
             return JSONResponse(
                 status_code=400,
                 content={"error": "Job ID is required"}
             )
+        try:
+            # "md" repeats "description" and stays in by default for older
+            # callers; e.g. fields=description,organization leaves it out
+            selected = parse_fields(fields, JOB_FIELDS)
+        except ValueError as e:
+            return invalid_fields(e)
         
         try:
-            logger.info(f"Processing scrape request for job ID: {jobId}")
-            job_data = await job_scraper.scrape(jobId)
+            logger.info("Processing scrape request", job_id=jobId)
+            job_data = await job_scraper.scrape(jobId, request_deadline(request))
             
             if not job_data or not job_data.get("md"):
-                logger.error(f"Empty job data returned for job ID: {jobId}")
+                logger.error("Empty job data returned", job_id=jobId)
                 return JSONResponse(
                     status_code=404,
                     content={"error": "No job content found"}
                 )
             
-            logger.info(f"Successfully retrieved job data for ID: {jobId}, content length: {len(job_data['md'])}")
-            return job_data
+            logger.info("Retrieved job data", job_id=jobId, length=len(job_data['md']))
+            if skills or duplicates:
+                # job_data may be the cached dict itself, so don't modify it
+                job_data = dict(job_data)
+                if skills:
+                    job_data["skills"] = await asyncio.to_thread(skill_extractor.extract, job_data["description"])
+                if duplicates:
+                    job_data["duplicates"] = await find_duplicates(similarity["jobs"], jobId, job_data["description"])
+            return select_fields(job_data, selected)
             
+        except JobNotFoundError as e:
+            logger.error("No job content", job_id=jobId, error=str(e))
+            return JSONResponse(
+                status_code=404,
+                content={"error": "No job content found"}
+            )
+        except JobPageLimitError as e:
+            logger.warning("Job page over limits", job_id=jobId, error=str(e))
+            return JSONResponse(status_code=422, content={"error": str(e)})
+        except DeadlineExceeded as e:
+            return deadline_exceeded(e)
+        except CircuitOpenError as e:
+            return circuit_open(e)
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Error processing job ID {jobId}: {error_msg}")
-            logger.error(traceback.format_exc())
+            logger.error("Error processing job", job_id=jobId, error=error_msg, exc_info=True)
             
             # Return error without any dummy data
             return JSONResponse(
@@ -71,4 +425,221 @@ def create_app() -> FastAPI:
                 content={"error": f"Failed to scrape job: {error_msg}"}
             )
 
+    @app.post("/scrape-jobs")
+    async def scrape_jobs(request: ScrapeJobsRequest, fields: Optional[str] = None):
+        job_ids = [job_id for job_id in request.jobIds if job_id]
+        if not job_ids:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "At least one job ID is required"}
+            )
+        try:
+            selected = parse_fields(fields, JOB_FIELDS)
+        except ValueError as e:
+            return invalid_fields(e)
+        if len(job_ids) > settings.SCRAPE_BATCH_MAX_JOBS:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"At most {settings.SCRAPE_BATCH_MAX_JOBS} job IDs per request"}
+            )
+
+        logger.info("Processing batch scrape request", jobs=len(job_ids))
+
+        async def stream_results():
+            # one JSON object per line, in completion order
+            results = job_scraper.scrape_many(
+                job_ids,
+                concurrency=settings.SCRAPE_BATCH_CONCURRENCY,
+                timeout=settings.REQUEST_TIMEOUT
+            )
+            async for job_id, job_data, error in results:
+                if error is None:
+                    line = {"jobId": job_id, "status": 200, "data": select_fields(job_data, selected)}
+                elif isinstance(error, JobNotFoundError):
+                    line = {"jobId": job_id, "status": 404, "error": "No job content found"}
+                elif isinstance(error, JobPageLimitError):
+                    line = {"jobId": job_id, "status": 422, "error": str(error)}
+                elif isinstance(error, DeadlineExceeded):
+                    line = {"jobId": job_id, "status": 504, "error": "Request deadline exceeded"}
+                elif isinstance(error, CircuitOpenError):
+                    line = {"jobId": job_id, "status": 503, "error": "LinkedIn is unavailable, retry later"}
+                else:
+                    line = {"jobId": job_id, "status": 500, "error": str(error)}
+                yield ndjson_line(line)
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    @app.post("/extract-skills")
+    async def extract_skills(request: ExtractSkillsRequest):
+        return await asyncio.to_thread(skill_extractor.extract, request.text)
+
+    @app.post("/extract-skills/batch")
+    async def extract_skills_batch(request: ExtractSkillsBatchRequest):
+        if not request.texts:
+            return JSONResponse(status_code=400, content={"error": "At least one text is required"})
+        if len(request.texts) > settings.SKILLS_BATCH_MAX_DOCUMENTS:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"At most {settings.SKILLS_BATCH_MAX_DOCUMENTS} texts per request"}
+            )
+
+        def extract_all():
+            return [skill_extractor.extract(text) for text in request.texts]
+
+        return {"results": await asyncio.to_thread(extract_all)}
+
+    @app.post("/extract-skills/reload")
+    async def reload_skills():
+        try:
+            return await asyncio.to_thread(skill_extractor.load)
+        except SkillDictionaryError as e:
+            logger.error("Skill dictionary reload failed", error=str(e))
+            return JSONResponse(status_code=500, content={"error": str(e)})
+
+    @app.post("/near-duplicates")
+    async def near_duplicates(request: NearDuplicatesRequest):
+        index = similarity.get(request.kind)
+        if index is None:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"Unknown kind, expected one of: {', '.join(similarity)}"}
+            )
+        if request.add and not request.key:
+            return JSONResponse(status_code=400, content={"error": "A key is required to add the text"})
+
+        fingerprint = await asyncio.to_thread(simhash, request.text)
+        # a document re-checked under its own key isn't its own duplicate
+        matches = duplicate_matches(index, fingerprint, exclude=request.key)
+        if request.add:
+            index.add_fingerprint(request.key, fingerprint)
+        return {"duplicate": bool(matches), "matches": matches, "fingerprint": f"{fingerprint:016x}"}
+
+    # asynchronous job API: submit returns 202 with the job record straight
+    # away; poll GET /jobs/{id} or pass callbackUrl to have the finished
+    # record POSTed back
+
+    def read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def remove_spooled_upload(payload):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(payload["path"])
+
+    async def run_parse_pdf_job(payload):
+        try:
+            # queued jobs keep their upload on disk; only running ones hold it in memory
+            content = await asyncio.to_thread(read_file, payload["path"])
+            text = await pdf_service.extract_text(
+                content,
+                profile=payload["profile"],
+                pages=payload["pages"],
+                deadline=Deadline(settings.ASYNC_JOBS_TIMEOUT),
+                wait_for_worker=True
+            )
+        except DeadlineExceeded:
+            raise JobFailedError("Job deadline exceeded", 504)
+        except PDFTransientError as e:
+            raise JobFailedError(str(e), 503)
+        except PDFLimitError as e:
+            raise JobFailedError(str(e), 413)
+        except PDFException as e:
+            raise JobFailedError(str(e), 422)
+        return {"text": text}
+
+    async def run_scrape_job(job_id):
+        try:
+            return await job_scraper.scrape(job_id, Deadline(settings.ASYNC_JOBS_TIMEOUT))
+        except JobNotFoundError:
+            raise JobFailedError("No job content found", 404)
+        except JobPageLimitError as e:
+            raise JobFailedError(str(e), 422)
+        except DeadlineExceeded:
+            raise JobFailedError("Job deadline exceeded", 504)
+        except CircuitOpenError:
+            raise JobFailedError("LinkedIn is unavailable, retry later", 503)
+
+    scheduler.register("parse-pdf", run_parse_pdf_job, cleanup=remove_spooled_upload)
+    scheduler.register("scrape-job", run_scrape_job)
+
+    def invalid_priority(priority: str):
+        if priority not in PRIORITIES:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"Unknown priority, expected one of: {', '.join(PRIORITIES)}"}
+            )
+        return None
+
+    async def submit_job(kind: str, payload, params: dict, priority: str, callback_url: Optional[str], size: int = 0):
+        invalid = invalid_priority(priority)
+        if invalid:
+            return invalid
+        try:
+            job = await scheduler.submit(
+                kind, payload, params, priority=priority, callback_url=callback_url, size=size
+            )
+        except CallbackURLError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        except JobQueueFullError as e:
+            logger.warning("Rejecting job", kind=kind, error=str(e))
+            return JSONResponse(
+                status_code=503,
+                content={"error": "Job queue is full, retry later"},
+                headers={"Retry-After": "5"}
+            )
+        return JSONResponse(status_code=202, content=job.to_dict(), headers={"Location": f"/jobs/{job.id}"})
+
+    @app.post("/jobs/parse-pdf")
+    async def submit_parse_pdf(
+        file: UploadFile = File(...),
+        profile: str = DEFAULT_PROFILE,
+        pages: Optional[str] = None,
+        priority: str = "normal",
+        callbackUrl: Optional[str] = None
+    ):
+        if not file.filename.endswith('.pdf'):
+            raise HTTPException(400, "File must be a PDF")
+        invalid = invalid_pdf_options(profile, pages) or invalid_priority(priority)
+        if invalid:
+            return invalid
+
+        try:
+            path = await pdf_service.spool(file.read)
+        except PDFLimitError as e:
+            return JSONResponse(status_code=413, content={"error": str(e)})
+        except PDFException as e:
+            return JSONResponse(status_code=422, content={"error": str(e)})
+        size = os.path.getsize(path)
+        PAYLOAD_BYTES.labels(kind="pdf_upload").observe(size)
+        params = {"filename": file.filename, "profile": profile, "pages": pages}
+        payload = {"path": path, "profile": profile, "pages": pages}
+        response = await submit_job("parse-pdf", payload, params, priority, callbackUrl, size=size)
+        if response.status_code != 202:
+            # not queued, so nothing else will remove it
+            remove_spooled_upload(payload)
+        return response
+
+    @app.post("/jobs/scrape-job")
+    async def submit_scrape_job(jobId: str, priority: str = "normal", callbackUrl: Optional[str] = None):
+        if not jobId:
+            return JSONResponse(status_code=400, content={"error": "Job ID is required"})
+        return await submit_job("scrape-job", jobId, {"jobId": jobId}, priority, callbackUrl)
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        job = await scheduler.get(job_id)
+        if job is None:
+            return JSONResponse(status_code=404, content={"error": "Unknown or expired job"})
+        return job
+
+    @app.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str):
+        try:
+            job = await scheduler.cancel(job_id)
+        except JobNotCancellableError as e:
+            return JSONResponse(status_code=409, content={"error": str(e)})
+        if job is None:
+            return JSONResponse(status_code=404, content={"error": "Unknown or expired job"})
+        return job
+
     return app
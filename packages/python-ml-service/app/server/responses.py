@@ -0,0 +1,31 @@
+from typing import Any, Iterable, List, Optional
+import orjson
+from fastapi.responses import JSONResponse
+
+# top-level keys a caller can pick with ?fields=
+JOB_FIELDS = ("md", "description", "organization", "posted_time_ago", "skills", "duplicates")
+PDF_FIELDS = ("text", "skills", "duplicates")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialised with orjson, several times faster on large text"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def ndjson_line(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+def parse_fields(spec: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Field names from a comma-separated ``fields`` parameter; None means all"""
+    if spec is None:
+        return None
+    fields = [field.strip() for field in spec.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown) or spec}, expected any of: {', '.join(allowed)}")
+    return fields
+
+def select_fields(content: dict, fields: Optional[List[str]]) -> dict:
+    if fields is None:
+        return content
+    return {field: content[field] for field in fields if field in content}
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import random
+import signal
+import socket
+import time
+import uvicorn
+import structlog
+from prometheus_client import multiprocess
+from ..logs import flush_logging
+from ..metrics import RECYCLES
+from ..services.memory import rss_bytes
+
+logger = structlog.get_logger(__name__)
+
+# a worker dying sooner than this after starting is treated as a crash loop
+# and replaced only after a pause
+MIN_WORKER_UPTIME = 5.0
+# seconds between resident memory checks of a worker with max_rss set
+RSS_CHECK_INTERVAL = 5.0
+
+class Supervisor:
+    """Pre-fork process manager for the HTTP server.
+
+    The parent binds the listening socket and is expected to have imported
+    the application (pdfminer, bs4, FastAPI) already, so every forked worker
+    starts with those modules loaded and accepts connections on the shared
+    socket. Workers that exit, because they reached their request or
+    memory limit or crashed, are replaced until the supervisor receives
+    SIGTERM or SIGINT.
+    """
+
+    def __init__(
+        self,
+        app_factory,
+        host: str,
+        port: int,
+        workers: int,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info",
+        max_rss: int = 0
+    ):
+        self.logger = logger.bind(service="Supervisor")
+        self.app_factory = app_factory
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.max_rss = max_rss
+        self._children = {}  # pid -> monotonic start time
+        self._stopping = False
+
+    def run(self) -> int:
+        sock = self._bind()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self.logger.info("Serving", host=self.host, port=self.port, workers=self.workers)
+
+        try:
+            while not self._stopping:
+                while len(self._children) < self.workers and not self._stopping:
+                    self._spawn(sock)
+                time.sleep(0.5)
+                self._reap()
+        finally:
+            self._shutdown()
+            sock.close()
+        return 0
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        return sock
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def _spawn(self, sock: socket.socket):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._serve(sock)
+            except BaseException:
+                self.logger.exception("Worker failed")
+            finally:
+                flush_logging()
+                os._exit(code)
+
+        self._children[pid] = time.monotonic()
+        self.logger.info("Started worker", pid=pid)
+
+    def _serve(self, sock: socket.socket) -> int:
+        # uvicorn installs its own handlers for a graceful stop
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # forked workers share the parent's random state
+        random.seed()
+
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+
+        config = uvicorn.Config(
+            self.app_factory(),
+            log_level=self.log_level,
+            log_config=None,
+            limit_max_requests=max_requests or None,
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        server = uvicorn.Server(config)
+        asyncio.run(self._run_server(server, sock))
+        return 0 if server.started else 1
+
+    async def _run_server(self, server: uvicorn.Server, sock: socket.socket):
+        watcher = asyncio.create_task(self._watch_rss(server)) if self.max_rss else None
+        try:
+            await server.serve(sockets=[sock])
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _watch_rss(self, server: uvicorn.Server):
+        # stopping the way max_requests does lets in-flight requests finish
+        while not server.should_exit:
+            await asyncio.sleep(RSS_CHECK_INTERVAL)
+            rss = rss_bytes()
+            if rss > self.max_rss:
+                self.logger.warning("Restarting worker over memory limit", pid=os.getpid(), rss_mb=rss >> 20)
+                RECYCLES.labels(pool="server", reason="rss").inc()
+                server.should_exit = True
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            started = self._children.pop(pid, None)
+            if started is None:
+                continue
+            if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+                multiprocess.mark_process_dead(pid)
+
+            code = os.waitstatus_to_exitcode(status)
+            # uvicorn re-raises the stop signal once it has shut down
+            if code == 0 or (self._stopping and code == -signal.SIGTERM):
+                self.logger.info("Worker exited", pid=pid)
+            else:
+                self.logger.warning("Worker exited", pid=pid, status=code)
+                if time.monotonic() - started < MIN_WORKER_UPTIME:
+                    time.sleep(1)
+
+    def _shutdown(self):
+        self.logger.info("Stopping workers", workers=len(self._children))
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        # uvicorn gives in-flight requests graceful_timeout to finish
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self._reap()
+
+        for pid in self._children:
+            self.logger.warning("Killing worker after the graceful shutdown timeout", pid=pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self._children:
+            self._reap()
+            time.sleep(0.1)
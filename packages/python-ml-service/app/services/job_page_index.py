@@ -0,0 +1,211 @@
+import re
+from html.parser import HTMLParser
+from bs4 import Tag
+from bs4.element import NavigableString
+
+# string types Tag.get_text() counts for ordinary tags (script, style and
+# template tags count their own string types instead)
+MAIN_STRING_TYPES = frozenset(Tag.MAIN_CONTENT_STRING_TYPES)
+
+# (selector text, tag name, required classes, alt substring), in priority order
+LOGO_SELECTORS = [
+    ("img.artdeco-entity-image", "img", ("artdeco-entity-image",), None),
+    ("img.contextual-sign-in-modal__img", "img", ("contextual-sign-in-modal__img",), None),
+    ("img.lazy-loaded", "img", ("lazy-loaded",), None),
+    ("img[alt*='company']", "img", (), "company"),
+    ("img[alt*='logo']", "img", (), "logo"),
+]
+LOGO_CLASS_PATTERN = re.compile(r".*company-logo.*|.*logo.*|.*entity-image.*")
+
+ORGANIZATION_SELECTORS = {
+    "org_logo": ("artdeco-entity-image", "artdeco-entity-image--square-5"),
+    "org_name": ("topcard__org-name-link",),
+    "work_location": ("topcard__flavor", "topcard__flavor--bullet"),
+    "timestamp": ("posted-time-ago__text",),
+}
+
+DESCRIPTION_KEYWORDS = ["requirements", "responsibilities", "qualifications", "experience required", "skills"]
+_KEYWORD_PATTERNS = [(keyword, re.compile(keyword, re.IGNORECASE)) for keyword in DESCRIPTION_KEYWORDS]
+_ANY_KEYWORD = re.compile("|".join(DESCRIPTION_KEYWORDS), re.IGNORECASE)
+
+# elements without an end tag
+VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+))
+
+def image_url(image: Tag) -> str:
+    """The usable URL of an <img>: an absolute src, else the lazy-load URL"""
+    src = image.get("src")
+    if src and src.startswith("http"):
+        return src
+    return image.get("data-delayed-url") or ""
+
+class JobPageIndex:
+    """Everything JobScraper looks up in a job page, gathered in one walk.
+
+    Each lookup keeps the first match in document order, which is what the
+    equivalent ``find``/``select_one`` call would return. Subtree text
+    lengths are accumulated bottom-up during the same walk so the "largest
+    text block" fallback doesn't call ``get_text()`` on every div.
+    """
+
+    def __init__(self, soup, description_class: str):
+        self.soup = soup
+        self.description = None
+        self.organization = dict.fromkeys(ORGANIZATION_SELECTORS)
+        self.logo_images = dict.fromkeys(selector for selector, *_ in LOGO_SELECTORS)
+        self.logo_pattern_image = None
+        self.first_image_with_url = None
+        self.job_description_div = None
+        self.keyword_strings = dict.fromkeys(DESCRIPTION_KEYWORDS)
+        self.blocks = []
+        self._text_lengths = {}
+        self._stripped_lengths = {}
+        self._walk(description_class)
+
+    def _walk(self, description_class: str):
+        text_lengths = self._text_lengths
+        stripped_lengths = self._stripped_lengths
+        tags = []
+
+        for node in self.soup.descendants:
+            if isinstance(node, Tag):
+                tags.append(node)
+                self._visit_tag(node, description_class)
+                continue
+
+            if not isinstance(node, NavigableString):
+                continue
+            if type(node) in MAIN_STRING_TYPES:
+                parent = id(node.parent)
+                text_lengths[parent] = text_lengths.get(parent, 0) + len(node)
+                stripped_lengths[parent] = stripped_lengths.get(parent, 0) + len(node.strip())
+            if _ANY_KEYWORD.search(node):
+                for keyword, pattern in _KEYWORD_PATTERNS:
+                    if self.keyword_strings[keyword] is None and pattern.search(node):
+                        self.keyword_strings[keyword] = node
+
+        # children come after their parents in document order, so walking
+        # backwards folds every subtree total into its parent exactly once
+        for tag in reversed(tags):
+            key, parent = id(tag), id(tag.parent)
+            text_lengths[parent] = text_lengths.get(parent, 0) + text_lengths.get(key, 0)
+            stripped_lengths[parent] = stripped_lengths.get(parent, 0) + stripped_lengths.get(key, 0)
+
+    def _visit_tag(self, tag: Tag, description_class: str):
+        classes = tag.get("class") or []
+        if isinstance(classes, str):
+            classes = classes.split()
+
+        if self.description is None and description_class in classes:
+            self.description = tag
+
+        for field, required in ORGANIZATION_SELECTORS.items():
+            if self.organization[field] is None and all(name in classes for name in required):
+                self.organization[field] = tag
+
+        name = tag.name
+        if name == "img":
+            self._visit_image(tag, classes)
+        elif name in ("div", "section"):
+            self.blocks.append(tag)
+            if (
+                name == "div"
+                and self.job_description_div is None
+                and classes
+                and any("job" in c.lower() for c in classes)
+                and any("description" in c.lower() for c in classes)
+            ):
+                self.job_description_div = tag
+
+    def _visit_image(self, image: Tag, classes):
+        for selector, _, required, alt_contains in LOGO_SELECTORS:
+            if self.logo_images[selector] is not None:
+                continue
+            if required and not all(name in classes for name in required):
+                continue
+            if alt_contains and alt_contains not in (image.get("alt") or ""):
+                continue
+            self.logo_images[selector] = image
+
+        if self.logo_pattern_image is None and any(LOGO_CLASS_PATTERN.search(c) for c in classes):
+            self.logo_pattern_image = image
+
+        if self.first_image_with_url is None and image_url(image):
+            self.first_image_with_url = image
+
+    def text_length(self, tag: Tag, strip: bool = False) -> int:
+        """len(tag.get_text()) or len(tag.get_text(strip=True)), from the index"""
+        if tag.interesting_string_types != MAIN_STRING_TYPES:
+            return len(tag.get_text(strip=strip))
+        lengths = self._stripped_lengths if strip else self._text_lengths
+        return lengths.get(id(tag), 0)
+
+class JobPageScanner(HTMLParser):
+    """Follows a job page as it downloads and tells when the part read so
+    far holds everything the primary selectors find in the whole page.
+
+    That is: the description element, closed and with text, every
+    organization field closed, and a usable URL on the first
+    ``img.artdeco-entity-image``, the logo selector tried first. Only the
+    first match of each is looked at, so a prefix that is ``complete``
+    gives JobPageIndex the same elements as the full page. Once
+    ``possible`` is false the rest of the page is needed after all (a
+    fallback would have to search it).
+    """
+
+    def __init__(self, description_class: str):
+        super().__init__(convert_charrefs=False)
+        self._selectors = {"description": (description_class,), **ORGANIZATION_SELECTORS}
+        # field -> [tag name, open elements of that name] until it closes
+        self._open = {}
+        self._closed = set()
+        self._description_text = False
+        self._logo_usable = None
+        self.complete = False
+        self.possible = True
+
+    def handle_starttag(self, tag, attrs):
+        for field in self._open.values():
+            if field[0] == tag:
+                field[1] += 1
+
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if not classes:
+            return
+        for field, required in self._selectors.items():
+            if field in self._open or field in self._closed:
+                continue
+            if all(name in classes for name in required):
+                if tag in VOID_ELEMENTS:
+                    self._closed.add(field)
+                else:
+                    self._open[field] = [tag, 1]
+
+        if tag == "img" and self._logo_usable is None and "artdeco-entity-image" in classes:
+            src = attrs.get("src")
+            self._logo_usable = bool(src and src.startswith("http") or attrs.get("data-delayed-url"))
+            self.possible = self._logo_usable
+        self._update()
+
+    def handle_endtag(self, tag):
+        for field, state in list(self._open.items()):
+            if state[0] == tag:
+                state[1] -= 1
+                if not state[1]:
+                    del self._open[field]
+                    self._closed.add(field)
+        self._update()
+
+    def handle_data(self, data):
+        if not self._description_text and "description" in self._open and data.strip():
+            self._description_text = True
+
+    def _update(self):
+        self.complete = (
+            self.possible
+            and self._logo_usable is True
+            and self._description_text
+            and len(self._closed) == len(self._selectors)
+        )
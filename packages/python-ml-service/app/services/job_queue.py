@@ -0,0 +1,395 @@
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import socket
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+import httpx
+import structlog
+from .result_cache import ResultCache
+
+logger = structlog.get_logger(__name__)
+
+# lower runs first; interactive callers use "high" to overtake backfills
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class JobQueueFullError(Exception):
+    """Too many jobs are waiting; the caller should retry later"""
+    pass
+
+class JobNotCancellableError(Exception):
+    """The job has finished or is running on another worker"""
+    pass
+
+class CallbackURLError(ValueError):
+    """A callbackUrl the service won't POST to"""
+    pass
+
+class JobFailedError(Exception):
+    """Raised by handlers to fail a job with an HTTP-style status"""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+class AsyncJob:
+    """One submitted unit of work and its outcome"""
+
+    def __init__(self, kind: str, payload: Any, params: dict, priority: str, callback_url: Optional[str], size: int = 0):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        # handler input; dropped once the job finishes
+        self.payload = payload
+        # bytes of input held for the job while it waits
+        self.size = size
+        # JSON-safe description of the input, echoed back to pollers
+        self.params = params
+        self.priority = priority
+        self.callback_url = callback_url
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.error_status = None
+        self.task = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        self.payload = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "params": self.params,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "errorStatus": self.error_status,
+        }
+
+class CallbackPolicy:
+    """Which callback URLs jobs may POST their results to.
+
+    The scheme and host have to be on the allowlists (a host starting with
+    "." also allows its subdomains), and every address the host resolves to
+    has to be public, so callbacks can't reach loopback, the private
+    network or cloud metadata endpoints. No hosts means no callbacks.
+    """
+
+    def __init__(self, hosts: Iterable[str] = (), schemes: Iterable[str] = ("https",)):
+        self.hosts = [host.lower() for host in hosts]
+        self.schemes = [scheme.lower() for scheme in schemes]
+
+    def _host_allowed(self, host: str) -> bool:
+        for allowed in self.hosts:
+            if host == allowed or (allowed.startswith(".") and host.endswith(allowed)):
+                return True
+        return False
+
+    async def check(self, url: str):
+        """Raises CallbackURLError unless ``url`` may be called"""
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            raise CallbackURLError("Invalid callback URL")
+        host = (parts.hostname or "").lower()
+        if parts.scheme.lower() not in self.schemes:
+            raise CallbackURLError(f"Callback URL scheme must be one of: {', '.join(self.schemes) or 'none'}")
+        if not host or not self._host_allowed(host):
+            raise CallbackURLError("Callback URL host is not allowed")
+
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                host, port or (443 if parts.scheme.lower() == "https" else 80), type=socket.SOCK_STREAM
+            )
+        except OSError:
+            raise CallbackURLError("Callback URL host does not resolve")
+        for *_, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+            if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                raise CallbackURLError("Callback URL resolves to a non-public address")
+
+class JobScheduler:
+    """In-process scheduler for the asynchronous job API.
+
+    Each kind of job has its own priority queue and concurrency limit, so a
+    backlog of scrapes never holds up PDF parsing and a "high" priority job
+    starts before any queued "normal" or "low" one. Finished jobs are kept
+    for ``result_ttl`` seconds. With a ``store`` (a disk-backed ResultCache
+    shared by all server workers) every state change is written there too,
+    so any worker can answer a poll for a job another worker owns.
+
+    Queued jobs are capped by count and, through the ``size`` given on
+    submit, by the bytes of input they hold (``max_queued_bytes``, 0 for
+    no cap). Callback URLs are checked against ``callback_policy`` on
+    submit and again before each POST.
+    """
+
+    def __init__(
+        self,
+        concurrency: Dict[str, int],
+        max_queued: int = 1000,
+        result_ttl: float = 3600,
+        store: ResultCache = None,
+        callback_timeout: float = 10.0,
+        callback_attempts: int = 3,
+        max_queued_bytes: int = 0,
+        callback_policy: CallbackPolicy = None
+    ):
+        self.logger = logger.bind(service="JobScheduler")
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.store = store
+        self.callback_timeout = callback_timeout
+        self.callback_attempts = callback_attempts
+        self.max_queued_bytes = max_queued_bytes
+        self.callback_policy = callback_policy or CallbackPolicy()
+        self._handlers = {}
+        self._cleanups = {}
+        self._queued_bytes = 0
+        self._queues = {kind: [] for kind in concurrency}
+        self._running = dict.fromkeys(concurrency, 0)
+        self._jobs = {}
+        self._finished = deque()
+        self._order = itertools.count()
+        self._callbacks = set()
+        self._client = None
+
+    def register(self, kind: str, handler: Callable[[Any], Awaitable[Any]], cleanup: Callable[[Any], None] = None):
+        """``handler(payload)`` returns the JSON-serialisable job result.
+
+        ``cleanup(payload)`` runs once the job ends however it ends
+        (finished, failed, cancelled or shut down), e.g. to remove a
+        spooled upload.
+        """
+        self._handlers[kind] = handler
+        if cleanup is not None:
+            self._cleanups[kind] = cleanup
+
+    def queued(self, kind: str) -> int:
+        return sum(1 for *_, job in self._queues[kind] if job.status == QUEUED)
+
+    def running(self, kind: str) -> int:
+        return self._running[kind]
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Any,
+        params: dict,
+        priority: str = "normal",
+        callback_url: Optional[str] = None,
+        size: int = 0
+    ) -> AsyncJob:
+        """Queue a job; raises CallbackURLError or JobQueueFullError"""
+        self._expire()
+        if callback_url:
+            await self.callback_policy.check(callback_url)
+        if sum(self.queued(name) for name in self._queues) >= self.max_queued:
+            raise JobQueueFullError(f"{self.max_queued} jobs are already queued")
+        if self.max_queued_bytes and self._queued_bytes + size > self.max_queued_bytes:
+            raise JobQueueFullError(f"Queued jobs already hold {self._queued_bytes} bytes")
+
+        job = AsyncJob(kind, payload, params, priority, callback_url, size)
+        self._queued_bytes += size
+        self._jobs[job.id] = job
+        heapq.heappush(self._queues[kind], (PRIORITIES[priority], next(self._order), job))
+        await self._save(job)
+        self.logger.info("Queued job", kind=kind, job_id=job.id, priority=priority)
+        self._dispatch(kind)
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is not None:
+            return await self.store.get(job_id)
+        return None
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a queued or running job; returns None for unknown jobs"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return await self._cancel_remote(job_id)
+        if job.finished:
+            raise JobNotCancellableError(f"Job {job_id} has already {job.status}")
+
+        running = job.task is not None
+        self._finish(job, CANCELLED)
+        self._finished.append((job.finished_at, job.id))
+        if running:
+            # pages already handed to a PDF worker still run to completion
+            job.task.cancel()
+        self.logger.info("Cancelled job", kind=job.kind, job_id=job.id, was_running=running)
+        await self._save(job)
+        self._notify(job)
+        return job.to_dict()
+
+    async def _cancel_remote(self, job_id: str) -> Optional[dict]:
+        record = await self.store.get(job_id) if self.store is not None else None
+        if record is None:
+            return None
+        if record["status"] != QUEUED:
+            raise JobNotCancellableError(f"Job {job_id} is {record['status']} on another worker")
+        # the owning worker checks the store before it starts the job
+        record.update(status=CANCELLED, finishedAt=time.time())
+        await self.store.set(job_id, record)
+        return record
+
+    def _finish(self, job: AsyncJob, status: str):
+        self._unqueue(job)
+        payload = job.payload
+        job.finish(status)
+        cleanup = self._cleanups.get(job.kind)
+        if cleanup is not None and payload is not None:
+            try:
+                cleanup(payload)
+            except Exception as e:
+                self.logger.warning("Job cleanup failed", kind=job.kind, job_id=job.id, error=str(e))
+
+    def _unqueue(self, job: AsyncJob):
+        # the job stopped waiting, so its input no longer counts as queued
+        self._queued_bytes -= job.size
+        job.size = 0
+
+    def _dispatch(self, kind: str):
+        queue = self._queues[kind]
+        while queue and self._running[kind] < self.concurrency[kind]:
+            *_, job = heapq.heappop(queue)
+            if job.status != QUEUED:
+                continue
+            self._running[kind] += 1
+            self._unqueue(job)
+            job.task = asyncio.ensure_future(self._run(job))
+            # a done callback also fires for a task cancelled before it started
+            job.task.add_done_callback(lambda _, kind=kind: self._release(kind))
+
+    def _release(self, kind: str):
+        self._running[kind] -= 1
+        self._dispatch(kind)
+
+    async def _run(self, job: AsyncJob):
+        if await self._cancelled_elsewhere(job):
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        await self._save(job)
+
+        try:
+            job.result = await self._handlers[job.kind](job.payload)
+            self._finish(job, SUCCEEDED)
+        except asyncio.CancelledError:
+            # cancel() or close() has already recorded the outcome
+            return
+        except JobFailedError as e:
+            job.error, job.error_status = str(e), e.status
+            self._finish(job, FAILED)
+        except Exception as e:
+            self.logger.error("Job failed", kind=job.kind, job_id=job.id, error=str(e))
+            job.error, job.error_status = str(e), 500
+            self._finish(job, FAILED)
+
+        self._finished.append((job.finished_at, job.id))
+        self.logger.info("Job finished", kind=job.kind, job_id=job.id, status=job.status, seconds=job.finished_at - job.started_at)
+        await self._save(job)
+        self._notify(job)
+
+    async def _cancelled_elsewhere(self, job: AsyncJob) -> bool:
+        if self.store is None:
+            return False
+        record = await self.store.get(job.id)
+        if record is None or record["status"] != CANCELLED:
+            return False
+        self._finish(job, CANCELLED)
+        self._finished.append((job.finished_at, job.id))
+        self._notify(job)
+        return True
+
+    async def _save(self, job: AsyncJob):
+        if self.store is not None:
+            await self.store.set(job.id, job.to_dict())
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        while self._finished and self._finished[0][0] <= cutoff:
+            _, job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+
+    def _notify(self, job: AsyncJob):
+        if not job.callback_url:
+            return
+        task = asyncio.ensure_future(self._post_callback(job.callback_url, job.to_dict()))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _post_callback(self, url: str, body: dict):
+        if self._client is None:
+            # redirects aren't followed, they could point anywhere
+            self._client = httpx.AsyncClient(timeout=self.callback_timeout, follow_redirects=False)
+        for attempt in range(1, self.callback_attempts + 1):
+            try:
+                # the host may resolve differently than when the job was queued
+                await self.callback_policy.check(url)
+            except CallbackURLError as e:
+                self.logger.warning("Dropping job callback", job_id=body["id"], error=str(e))
+                return
+            try:
+                response = await self._client.post(url, json=body)
+                if response.status_code < 500:
+                    return
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e)
+            self.logger.warning(
+                "Job callback failed", job_id=body['id'], error=error, attempt=attempt, attempts=self.callback_attempts
+            )
+            if attempt < self.callback_attempts:
+                await asyncio.sleep(2 ** attempt)
+
+    async def close(self):
+        stopped = []
+        for job in list(self._jobs.values()):
+            if job.finished:
+                continue
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+            # the job is lost with this process; release what it holds
+            self._finish(job, CANCELLED)
+            stopped.append(job)
+        # other workers answer polls from the store; without this they would
+        # report the job queued or running until its record expires
+        await asyncio.gather(*(self._save(job) for job in stopped))
+        for task in list(self._callbacks):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,282 +1,525 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import codecs
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from bs4 import BeautifulSoup, FeatureNotFound
+import logging
 import structlog
-import traceback
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import re
+from .result_cache import ResultCache
+from .single_flight import SingleFlight
+from .rate_limiter import HostRateLimiter
+from .resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded
+from .similarity_index import SimilarityIndex
+from .job_page_index import JobPageIndex, JobPageScanner, ORGANIZATION_SELECTORS, image_url
+from .memory import rss_bytes
+from ..metrics import JOB_PAGE_READS, LIMIT_REJECTIONS, PAYLOAD_BYTES, RETRIES, TASK_MEMORY_BYTES, stage
 
 logger = structlog.get_logger(__name__)
 
+# answers that mean LinkedIn is throttling us or unwell: retried, and
+# counted against the circuit breaker
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# characters handed to the JobPageScanner at a time; each batch is one
+# thread hop while the host slot is held
+SCAN_BATCH_CHARS = 64 * 1024
+
+class JobNotFoundError(ValueError):
+    """The job page was fetched but holds no job description"""
+    pass
+
+class JobPageLimitError(ValueError):
+    """The job page is too large to parse safely"""
+    pass
+
+def _retry_after_seconds(response: httpx.Response) -> float:
+    """Retry-After in seconds when given as a number, else 0"""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
 class JobScraper:
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: str = "https://www.linkedin.com/jobs/view/",
+        max_connections: int = 20,
+        max_connections_per_host: int = 6,
+        timeout: float = 30.0,
+        max_retries: int = 5,
+        backoff_factor: float = 0.1,
+        cache: ResultCache = None,
+        negative_ttl: float = 300,
+        rate_limit: float = 0,
+        rate_limit_burst: int = 1,
+        parser: str = "html.parser",
+        breaker: CircuitBreaker = None,
+        similarity: SimilarityIndex = None,
+        max_page_bytes: int = 0,
+        max_elements: int = 0,
+        incremental: bool = False
+    ):
         self.logger = logger.bind(service="JobScraper")
         self.class_name = "show-more-less-html__markup"
-        self.base_url = "https://www.linkedin.com/jobs/view/"
+        self.base_url = base_url
+        self.parser = self._resolve_parser(parser)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Sec-Fetch-User': '?1',
+            'Cache-Control': 'no-cache',
+            'Pragma': 'no-cache',
+        }
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # a parsed tree takes roughly 10x the HTML's size in memory; pages
+        # past these limits are refused before parsing (0 = no limit)
+        self.max_page_bytes = max_page_bytes
+        self.max_elements = max_elements
+        # stop downloading a page once the part read holds the job data
+        self.incremental = incremental
         
-        # Create session with retry capability
-        self.session = requests.Session()
-        retries = Retry(
-            total=5,
-            backoff_factor=0.1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET"]
-        )
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        # pooled keep-alive client, created on first use so it binds to the running loop
+        self._client = None
+        self._host_slots = {}
+        self._rate_limiter = HostRateLimiter(rate_limit, rate_limit_burst)
+        # stops sending requests for a while once LinkedIn keeps failing
+        self.breaker = breaker or CircuitBreaker("linkedin")
+
+        # scrape results by job ID; misses are cached too (for negative_ttl)
+        # and concurrent scrapes of one ID share a single fetch
+        self.cache = cache or ResultCache("jobs", max_entries=1024, ttl=3600)
+        self.negative_ttl = negative_ttl
+        self._in_flight = SingleFlight()
+        self._flight_deadlines = {}
+        # freshly scraped descriptions are fingerprinted here, keyed by job ID
+        self.similarity = similarity
+
+    def _resolve_parser(self, parser: str) -> str:
+        # lxml is much faster than html.parser but is an optional install
+        try:
+            BeautifulSoup("", parser)
+            return parser
+        except FeatureNotFound:
+            self.logger.warning("HTML parser is not installed, falling back to html.parser", parser=parser)
+            return "html.parser"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_slots[host]
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
-    async def scrape(self, job_id: str):
-        self.logger.info(f"Scraping job with ID: {job_id}")
+    async def scrape(self, job_id: str, deadline: Deadline = None):
+        deadline = deadline or Deadline(None)
+        cached = await self.cache.get(job_id)
+        if cached is not None:
+            self.logger.info("Serving job from cache", job_id=job_id)
+            if "error" in cached:
+                raise JobNotFoundError(cached["error"])
+            return cached
+
+        # a shared scrape runs until the latest deadline among the callers
+        # waiting on it; every caller still gives up at its own deadline.
+        # do() has started or joined the flight by now, so its deadline is
+        # extended before anything else gets to run
+        flight = self._in_flight.do(job_id, lambda: self._start_scrape(job_id, deadline))
+        shared = self._flight_deadlines.get(job_id)
+        if shared is not None:
+            shared.extend(deadline)
+        return await deadline.wait(flight, f"scrape of job {job_id}")
+
+    def _start_scrape(self, job_id: str, deadline: Deadline):
+        shared = self._flight_deadlines[job_id] = Deadline(deadline.remaining())
+
+        async def run():
+            try:
+                return await self._scrape(job_id, shared)
+            finally:
+                if self._flight_deadlines.get(job_id) is shared:
+                    del self._flight_deadlines[job_id]
+
+        return run()
+
+    async def scrape_many(self, job_ids, concurrency: int = 8, timeout: float = None):
+        """Scrape several jobs at once, yielding (job_id, job_data, error) as each finishes.
+
+        ``timeout`` bounds each job from the moment it starts.
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def run(job_id):
+            async with slots:
+                try:
+                    return job_id, await self.scrape(job_id, Deadline(timeout)), None
+                except Exception as e:
+                    return job_id, None, e
+
+        tasks = [asyncio.ensure_future(run(job_id)) for job_id in job_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # the consumer stopped early (e.g. client disconnected)
+            for task in tasks:
+                task.cancel()
+
+    async def _scrape(self, job_id: str, deadline: Deadline):
+        self.logger.info("Scraping job", job_id=job_id)
         url = f"{self.base_url}{job_id}"
         
         try:
-            job_data = self.get_job_description(url)
+            job_data = await self.get_job_description(url, deadline)
             if not job_data or not job_data.get('description'):
-                self.logger.error(f"No job description found for ID: {job_id}")
-                raise ValueError("No job content found")
+                self.logger.error("No job description found", job_id=job_id)
+                raise JobNotFoundError("No job content found")
                 
-            self.logger.info(f"Successfully scraped job information for ID: {job_id}")
+            self.logger.info("Scraped job", job_id=job_id)
+            await self.cache.set(job_id, job_data)
+            if self.similarity is not None:
+                await asyncio.to_thread(self.similarity.add, job_id, job_data['description'])
             return job_data
+        except JobNotFoundError as e:
+            self.logger.error("Error scraping job", job_id=job_id, error=str(e))
+            error = f"Failed to scrape job: {str(e)}"
+            await self.cache.set(job_id, {"error": error}, ttl=self.negative_ttl)
+            raise JobNotFoundError(error)
+        except (DeadlineExceeded, CircuitOpenError, JobPageLimitError) as e:
+            # not an answer about the job, so nothing is cached
+            self.logger.warning("Gave up scraping job", job_id=job_id, error=str(e))
+            raise
         except Exception as e:
-            self.logger.error(f"Error scraping job: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.error("Error scraping job", job_id=job_id, error=str(e), exc_info=True)
             raise ValueError(f"Failed to scrape job: {str(e)}")
+
+    async def _fetch(self, url: str, deadline: Deadline) -> Tuple[httpx.Response, Optional[str], bool]:
+        """GET with per-host connection limits and non-blocking exponential backoff.
+
+        Each attempt's timeout is capped by the deadline, no backoff is
+        started that would outlast it, and the circuit breaker is consulted
+        before every attempt. Returns the response with, for a 200, the page
+        text (see ``_read_page``) and whether all of it was read.
+        """
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            deadline.check(f"fetching {url}")
+            self.breaker.allow()
+            retry_after = 0.0
+            try:
+                await self._rate_limiter.acquire(host)
+                async with self._host_slot(host):
+                    request = client.build_request("GET", url, timeout=deadline.cap(self.timeout))
+                    response = await client.send(request, stream=True)
+                    try:
+                        html_content, complete = None, True
+                        if response.status_code == 200:
+                            html_content, complete = await self._read_page(response)
+                    finally:
+                        # closing a partly read response drops its connection
+                        await response.aclose()
+            except JobPageLimitError:
+                # LinkedIn answered fine, the page is just too big for us;
+                # a half-open circuit needs to hear that
+                self.breaker.record_success()
+                raise
+            except httpx.TransportError:
+                # a timeout we imposed for the deadline says nothing about LinkedIn
+                if deadline.expired:
+                    raise DeadlineExceeded(f"Deadline exceeded while fetching {url}")
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response, html_content, complete
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    return response, None, True
+                retry_after = _retry_after_seconds(response)
+            
+            delay = max(self.backoff_factor * (2 ** attempt), retry_after)
+            remaining = deadline.remaining()
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded(f"Deadline exceeded before retrying {url}")
+            attempt += 1
+            RETRIES.labels(operation="scrape_fetch").inc()
+            stage("scrape_retry_backoff").observe(delay)
+            self.logger.warning("Retrying job page", url=url, delay=round(delay, 2), attempt=attempt, max_retries=self.max_retries)
+            await asyncio.sleep(delay)
         
-    def get_job_description(self, url):
+    async def _read_page(self, response: httpx.Response) -> Tuple[str, bool]:
+        """The page text and whether all of it was read.
+
+        With ``incremental`` set, reading stops as soon as the text so far
+        holds the job description and organization fields; pages that need
+        a fallback selector are read to the end.
+        """
+        scanner = JobPageScanner(self.class_name) if self.incremental else None
+        # decoded here rather than with aiter_text() so the limit counts the
+        # page's bytes (after any Content-Encoding), not its characters
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        chunks = []
+        size = 0
+        # chunks[scanned:] hold the `pending` characters not yet scanned
+        scanned = pending = 0
+        async for data in response.aiter_bytes():
+            size += len(data)
+            if self.max_page_bytes and size > self.max_page_bytes:
+                LIMIT_REJECTIONS.labels(kind="job_page", limit="bytes").inc()
+                raise JobPageLimitError(f"Job page exceeds the {self.max_page_bytes} byte limit")
+            chunk = decoder.decode(data)
+            chunks.append(chunk)
+            if scanner is None:
+                continue
+            pending += len(chunk)
+            if pending < SCAN_BATCH_CHARS:
+                continue
+            # the scanner is pure Python, so keep it off the event loop too
+            await asyncio.to_thread(scanner.feed, "".join(chunks[scanned:]))
+            scanned, pending = len(chunks), 0
+            if scanner.complete:
+                JOB_PAGE_READS.labels(read="partial").inc()
+                return "".join(chunks), False
+            if not scanner.possible:
+                scanner = None
+        chunks.append(decoder.decode(b"", final=True))
+        JOB_PAGE_READS.labels(read="full").inc()
+        return "".join(chunks), True
+
+    async def get_job_description(self, url, deadline: Deadline = None):
+        deadline = deadline or Deadline(None)
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Sec-Fetch-User': '?1',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache',
-            }
-            
-            self.logger.info(f"Making HTTP request to: {url}")
-            response = self.session.get(url, headers=headers, timeout=30)
+            self.logger.debug("Fetching job page", url=url)
+            with stage("scrape_fetch").time():
+                response, html_content, complete = await self._fetch(url, deadline)
             
             if response.status_code != 200:
-                self.logger.error(f"LinkedIn API returned status code: {response.status_code}")
+                self.logger.error("LinkedIn returned an error", url=url, status=response.status_code)
                 raise ValueError(f"Failed to fetch job page: HTTP {response.status_code}")
-                
-            html_content = response.text
             
-            if not html_content or len(html_content) < 1000:
-                self.logger.error(f"Received insufficient HTML content, length: {len(html_content or '')}")
+            # a page cut short already showed every field we need
+            if complete and (not html_content or len(html_content) < 1000):
+                self.logger.error("Received insufficient HTML content", url=url, length=len(html_content or ''))
                 raise ValueError("Insufficient HTML content received")
             
-            self.logger.info(f"Received HTML content successfully, length: {len(html_content)}")
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
+            self.logger.debug("Received job page", url=url, length=len(html_content), complete=complete)
+            PAYLOAD_BYTES.labels(kind="job_html").observe(len(html_content))
+            self._check_page_limits(html_content)
+            deadline.check("parsing the job page")
             
-            job_description_selectors = [
-                {"type": "class", "value": self.class_name},  # primary selector .show-more-less-html__markup
-            ]
-            
-            organization_selectors = {
-                "org_logo": {"type": "selector", "value": ".artdeco-entity-image.artdeco-entity-image--square-5"},
-                "org_name": {"type": "selector", "value": ".topcard__org-name-link"},
-                "work_location": {"type": "selector", "value": ".topcard__flavor.topcard__flavor--bullet"},
-                "timestamp": {"type": "selector", "value": ".posted-time-ago__text"}
-            }
-            
-            job_description = None
-            primary_selector = {"type": "class", "value": self.class_name}  # show-more-less-html__markup
-            
-            elements = soup.find_all(class_=primary_selector["value"])
-            if elements:
-                self.logger.info(f"Found job description with primary selector: {primary_selector['value']}")
-                job_description = elements[0].get_text(separator='\n', strip=True)
-            
-            # try other selectors
-            if not job_description:
-                for selector in job_description_selectors:
-                    if selector["type"] == "class":
-                        elements = soup.find_all(class_=selector["value"])
-                    else:
-                        elements = soup.select(selector["value"])
-                    
-                    if elements:
-                        self.logger.info(f"Found job description with backup selector: {selector['value']}")
-                        job_description = elements[0].get_text(separator='\n', strip=True)
-                        break
-            
-            if not job_description:
-                job_description = self._find_job_description_alternative_methods(soup)
+            # parsing is CPU bound, keep it off the event loop
+            return await asyncio.to_thread(self._parse_job_page, html_content)
             
-            org_info = {}
-            for info_type, selector in organization_selectors.items():
-                try:
-                    if selector["type"] == "class":
-                        elements = soup.find_all(class_=selector["value"])
-                    else:
-                        elements = soup.select(selector["value"])
-                    
-                    if elements:
-                        if info_type == "org_logo":
-                            logo_url = self._extract_logo_url(elements[0], soup)
-                            if logo_url:
-                                org_info[info_type] = logo_url
-                                self.logger.info(f"Found {info_type}: {logo_url[:50]}...")
-                            else:
-                                org_info[info_type] = ""
-                                self.logger.warning(f"Could not extract logo URL")
-                        else:
-                            # for text content fields
-                            org_info[info_type] = elements[0].get_text(strip=True)
-                            self.logger.info(f"Found {info_type} with selector: {selector['value']}")
-                except Exception as e:
-                    self.logger.warning(f"Error extracting {info_type}: {str(e)}")
-                    org_info[info_type] = ""
-            
-            result = {
-                "md": job_description,  # for backward compatibility
-                "description": job_description,
-                "organization": {
-                    "logo_url": org_info.get("org_logo", ""),
-                    "name": org_info.get("org_name", ""),
-                    "location": org_info.get("work_location", ""),
-                },
-                "posted_time_ago": org_info.get("timestamp", "")  # job post timestamp "2 weeks ago", "3 days ago"
-            }
-            
-            return result
-            
-        except requests.RequestException as e:
-            self.logger.error(f"Request error: {str(e)}")
+        except (DeadlineExceeded, CircuitOpenError, JobPageLimitError):
+            raise
+        except httpx.HTTPError as e:
+            self.logger.error("Request error", url=url, error=str(e))
             raise ValueError(f"Request error: {str(e)}")
+        except JobNotFoundError as e:
+            self.logger.error("Error extracting job description", url=url, error=str(e))
+            raise JobNotFoundError(f"Failed to extract job description: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Error extracting job description: {str(e)}")
+            self.logger.error("Error extracting job description", url=url, error=str(e))
             raise ValueError(f"Failed to extract job description: {str(e)}")
+
+    def _check_page_limits(self, html_content: str):
+        # the size limit is enforced while reading, in _read_page
+        if self.max_elements:
+            # opening tags, comments and doctypes; close enough to size the tree
+            elements = html_content.count("<") - html_content.count("</")
+            if elements > self.max_elements:
+                LIMIT_REJECTIONS.labels(kind="job_page", limit="elements").inc()
+                raise JobPageLimitError(f"Job page has about {elements} elements, the limit is {self.max_elements}")
+
+    def _parse_job_page(self, html_content):
+        rss_before = rss_bytes()
+        with stage("scrape_parse").time():
+            soup = BeautifulSoup(html_content, self.parser)
+            try:
+                job_data = self._extract_job_data(soup)
+            finally:
+                # the tree is full of reference cycles; free it now rather
+                # than at the next garbage collection
+                soup.decompose()
+        # growth of the whole process, so only indicative with parses overlapping
+        TASK_MEMORY_BYTES.labels(pool="scrape").observe(max(0, rss_bytes() - rss_before))
+        return job_data
+
+    def _extract_job_data(self, soup):
+        with stage("scrape_selectors").time():
+            index = JobPageIndex(soup, self.class_name)
+        
+        job_description = None
+        if index.description is not None:
+            self.logger.debug("Found job description with primary selector", selector=self.class_name)
+            job_description = index.description.get_text(separator='\n', strip=True)
+        
+        if not job_description:
+            with stage("scrape_fallback").time():
+                job_description = self._find_job_description_alternative_methods(index)
+        
+        org_info = {}
+        for info_type, element in index.organization.items():
+            if element is None:
+                continue
+            try:
+                if info_type == "org_logo":
+                    logo_url = self._extract_logo_url(index)
+                    if logo_url:
+                        org_info[info_type] = logo_url
+                        self.logger.debug("Found organization field", field=info_type, value=logo_url)
+                    else:
+                        org_info[info_type] = ""
+                        self.logger.warning("Could not extract logo URL")
+                else:
+                    # for text content fields
+                    org_info[info_type] = element.get_text(strip=True)
+                    self.logger.debug("Found organization field", field=info_type, selector=ORGANIZATION_SELECTORS[info_type])
+            except Exception as e:
+                self.logger.warning("Error extracting organization field", field=info_type, error=str(e))
+                org_info[info_type] = ""
+        
+        result = {
+            "md": job_description,  # for backward compatibility
+            "description": job_description,
+            "organization": {
+                "logo_url": org_info.get("org_logo", ""),
+                "name": org_info.get("org_name", ""),
+                "location": org_info.get("work_location", ""),
+            },
+            "posted_time_ago": org_info.get("timestamp", "")  # job post timestamp "2 weeks ago", "3 days ago"
+        }
+        
+        return result
     
-    def _extract_logo_url(self, element, soup):
+    def _extract_logo_url(self, index):
         """Extract logo URL using direct, effective approach"""
         try:
-            self.logger.info("Extracting logo URL")
+            self.logger.debug("Extracting logo URL")
             
             # linkedin-specific selectors in order of specificity
-            selectors = [
-                "img.artdeco-entity-image",
-                "img.contextual-sign-in-modal__img",
-                "img.lazy-loaded",
-                "img[alt*='company']",
-                "img[alt*='logo']"
-            ]
-            
-            for selector in selectors:
-                image = soup.select_one(selector)
-                if image:
-                    if image.get("src") and image.get("src").startswith("http"):
-                        self.logger.info(f"Found logo URL with selector {selector}: {image.get('src')}")
-                        return image.get("src")
-                        
-                    # fallback
-                    elif image.get("data-delayed-url"):
-                        self.logger.info(f"Found logo URL (delayed) with selector {selector}: {image.get('data-delayed-url')}")
-                        return image.get("data-delayed-url")
+            for selector, image in index.logo_images.items():
+                if image is not None and image_url(image):
+                    self.logger.debug("Found logo URL", selector=selector)
+                    return image_url(image)
             
             #  regex pattern as a fallback
-            pattern_image = soup.find("img", attrs={"class": re.compile(r".*company-logo.*|.*logo.*|.*entity-image.*")})
-            if pattern_image:
-                if pattern_image.get("src") and pattern_image.get("src").startswith("http"):
-                    self.logger.info(f"Found logo URL with regex pattern: {pattern_image.get('src')}")
-                    return pattern_image.get("src")
-                elif pattern_image.get("data-delayed-url"):
-                    self.logger.info(f"Found logo URL (delayed) with regex pattern: {pattern_image.get('data-delayed-url')}")
-                    return pattern_image.get("data-delayed-url")
+            if index.logo_pattern_image is not None and image_url(index.logo_pattern_image):
+                self.logger.debug("Found logo URL with regex pattern")
+                return image_url(index.logo_pattern_image)
             
             # last resort: just get any image
-            all_images = soup.find_all("img")
-            for img in all_images:
-                if img.get("src") and img.get("src").startswith("http"):
-                    self.logger.info(f"Using fallback image: {img.get('src')}")
-                    return img.get("src")
-                elif img.get("data-delayed-url"):
-                    self.logger.info(f"Using fallback delayed image: {img.get('data-delayed-url')}")
-                    return img.get("data-delayed-url")
+            if index.first_image_with_url is not None:
+                self.logger.debug("Using fallback image as logo")
+                return image_url(index.first_image_with_url)
             
             self.logger.warning("No logo URL found with any method")
             return ""
         except Exception as e:
-            self.logger.error(f"Error in _extract_logo_url: {str(e)}")
+            self.logger.error("Error extracting logo URL", error=str(e))
             return ""
-    def _find_job_description_alternative_methods(self, soup):
+
+    def _find_job_description_alternative_methods(self, index):
         """Try alternative methods to find job description"""
         job_description = None
         
         self.logger.info("Direct selectors failed, attempting pattern-based search")
-        potential_elements = soup.find_all(lambda tag: tag.name == "div" and 
-                                         tag.attrs.get('class') and 
-                                         any('job' in c.lower() for c in tag.attrs.get('class')) and
-                                         any('description' in c.lower() for c in tag.attrs.get('class')))
-        
-        if potential_elements:
-            self.logger.info(f"Found job description with pattern matching, element classes: {potential_elements[0].get('class')}")
-            job_description = potential_elements[0].get_text(separator='\n', strip=True)
+        element = index.job_description_div
+        if element is not None:
+            self.logger.info("Found job description with pattern matching", classes=element.get('class'))
+            job_description = element.get_text(separator='\n', strip=True)
         
         if not job_description:
             self.logger.info("Pattern matching failed, attempting text search approach")
-            keywords = ["requirements", "responsibilities", "qualifications", "experience required", "skills"]
-            for keyword in keywords:
-                pattern = re.compile(keyword, re.IGNORECASE)
-                elements = soup.find_all(text=pattern)
-                if elements:
-                    parent = elements[0].parent
-                    while parent and parent.name not in ['div', 'section'] and len(parent.get_text()) < 500:
-                        parent = parent.parent
-                    
-                    if parent and len(parent.get_text()) > 200:
-                        self.logger.info(f"Found job description via keyword '{keyword}'")
-                        job_description = parent.get_text(separator='\n', strip=True)
-                        break
+            for keyword, string in index.keyword_strings.items():
+                if string is None:
+                    continue
+                parent = string.parent
+                while parent and parent.name not in ['div', 'section'] and index.text_length(parent) < 500:
+                    parent = parent.parent
+                
+                if parent and index.text_length(parent) > 200:
+                    self.logger.info("Found job description via keyword", keyword=keyword)
+                    job_description = parent.get_text(separator='\n', strip=True)
+                    break
         
         # Last resort: get the largest text block that might be the job description
         if not job_description:
             self.logger.info("All approaches failed, attempting to extract largest text block")
-            text_blocks = []
-            for tag in soup.find_all(['div', 'section']):
-                text = tag.get_text(strip=True)
-                if len(text) > 200:  # Minimum size for job description
-                    text_blocks.append((len(text), text))
+            largest = max((index.text_length(tag, strip=True) for tag in index.blocks), default=0)
             
-            if text_blocks:
-                text_blocks.sort(reverse=True)  # Sort by size
-                self.logger.info(f"Using largest text block as job description (size: {text_blocks[0][0]})")
-                job_description = text_blocks[0][1]
+            # minimum size for job description; ties go to the greatest text,
+            # as they would when sorting (length, text) pairs
+            if largest > 200:
+                job_description = max(
+                    tag.get_text(strip=True) for tag in index.blocks
+                    if index.text_length(tag, strip=True) == largest
+                )
+                self.logger.info("Using largest text block as job description", size=largest)
         
         if not job_description:
             # if no description found, dump HTML structure for debugging
             self.logger.error("Could not find job description with any method")
-            structure_report = self._generate_structure_report(soup)
-            self.logger.debug(f"HTML structure overview: {structure_report}")
-            raise ValueError("Job description not found in HTML")
+            if logging.getLogger(__name__).isEnabledFor(logging.DEBUG):
+                self.logger.debug("HTML structure overview", report=self._generate_structure_report(index))
+            raise JobNotFoundError("Job description not found in HTML")
         
         return job_description
     
-    def _generate_structure_report(self, soup):
+    def _generate_structure_report(self, index):
         """Generate a brief report of the HTML structure to help debug scraping issues"""
         structure = []
         
         # Look for key elements that might be interesting
         for tag_name in ['div', 'section']:
-            elements = soup.find_all(tag_name, class_=lambda x: x and ('job' in x.lower() or 'description' in x.lower()))
+            elements = [
+                tag for tag in index.blocks
+                if tag.name == tag_name and any(
+                    'job' in c.lower() or 'description' in c.lower() for c in tag.get('class') or []
+                )
+            ]
             if elements:
                 structure.append(f"Found {len(elements)} {tag_name} elements with job/description in class")
                 for i, elem in enumerate(elements[:3]):  # Show first 3
-                    structure.append(f"- {tag_name}#{i} classes: {elem.get('class')}, text length: {len(elem.text)}")
+                    structure.append(f"- {tag_name}#{i} classes: {elem.get('class')}, text length: {index.text_length(elem)}")
         
         # Also report any sections that have substantial text
         large_text_sections = []
-        for tag in soup.find_all(['div', 'section']):
-            text = tag.get_text(strip=True)
-            if len(text) > 500:
+        for tag in index.blocks:
+            size = index.text_length(tag, strip=True)
+            if size > 500:
                 class_names = tag.get('class', [])
-                large_text_sections.append((len(text), str(class_names)))
+                large_text_sections.append((size, str(class_names)))
         
         large_text_sections.sort(reverse=True)
         if large_text_sections:
@@ -0,0 +1,52 @@
+try:
+    import resource
+except ImportError:
+    # not available on Windows; limits and peak readings are skipped there
+    resource = None
+
+def _status_bytes(field: str) -> int:
+    """A kB figure from /proc/self/status, in bytes; 0 where unavailable"""
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(field.encode() + b":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def rss_bytes() -> int:
+    """Resident memory of this process right now"""
+    return _status_bytes("VmRSS")
+
+def peak_rss_bytes() -> int:
+    """Highest resident memory since start or the last reset_peak_rss()"""
+    peak = _status_bytes("VmHWM")
+    if not peak and resource is not None:
+        # ru_maxrss is in kB on Linux and can't be reset
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return peak
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def limit_heap(extra_bytes: int):
+    """Let this process allocate ``extra_bytes`` more heap, then MemoryError.
+
+    Caps the data segment (RLIMIT_DATA) rather than the address space, so
+    shared libraries and memory-mapped uploads don't count against it.
+    """
+    if resource is None or extra_bytes <= 0:
+        return
+    current = _status_bytes("VmData")
+    if not current:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+    soft = current + extra_bytes
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_DATA, (soft, hard))
@@ -1,9 +1,27 @@
+import asyncio
+import hashlib
 import io
+import itertools
+import mmap
+import os
+import tempfile
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import List, Optional, Union
 import structlog
-from pdfminer.high_level import extract_text
+from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
-from pdfminer.pdfparser import PDFSyntaxError
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser, PDFSyntaxError
+from tenacity import AsyncRetrying, stop_any, stop_after_attempt, wait_exponential, retry_if_exception_type
+from .worker_pool import WorkerPool, PoolSaturatedError
+from .result_cache import ResultCache
+from .resilience import Deadline, DeadlineExceeded
+from .similarity_index import SimilarityIndex
+from ..metrics import LIMIT_REJECTIONS, RETRIES, stage
 
 logger = structlog.get_logger(__name__)
 
@@ -11,41 +29,489 @@ class PDFException(Exception):
     """Base exception for PDF processing errors"""
     pass
 
+class PDFLimitError(PDFException):
+    """The upload exceeds the configured size or page limits"""
+    pass
+
+class PDFTransientError(PDFException):
+    """A failure that may not happen again, such as a crashed worker"""
+    pass
+
+# Named LAParams presets, selectable per request:
+#   fast      - no layout analysis, text in content-stream order
+#   balanced  - the long-standing default
+#   accurate  - tighter line/character grouping for multi-column layouts
+EXTRACTION_PROFILES = {
+    "fast": None,
+    "balanced": LAParams(
+        line_overlap=0.5,
+        char_margin=2.0,
+        line_margin=0.5,
+        word_margin=0.1,
+        boxes_flow=0.5,
+        detect_vertical=True,
+        all_texts=True
+    ),
+    "accurate": LAParams(
+        line_overlap=0.5,
+        char_margin=1.0,
+        line_margin=0.3,
+        word_margin=0.1,
+        boxes_flow=0.5,
+        detect_vertical=True,
+        all_texts=True
+    ),
+}
+DEFAULT_PROFILE = "balanced"
+
+def _render_text(fp, laparams: Optional[LAParams], page_numbers=None) -> str:
+    """Same pipeline as pdfminer's high_level.extract_text, but accepts any
+    seekable binary file object (including an mmap). ``laparams=None`` skips
+    layout analysis entirely."""
+    rsrcmgr = PDFResourceManager(caching=True)
+    with io.StringIO() as output:
+        device = TextConverter(rsrcmgr, output, codec='utf-8', laparams=laparams)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(fp, page_numbers, caching=True):
+            interpreter.process_page(page)
+        return output.getvalue()
+
+@contextmanager
+def _open_source(source: Union[bytes, str]):
+    """PDF bytes are wrapped in memory; a path (a spooled upload) is
+    memory-mapped so workers don't receive a pickled copy"""
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        yield data
+
+# the functions below run inside pool workers; they must stay importable at module level
+
+def _count_pages(source: Union[bytes, str]) -> int:
+    with _open_source(source) as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+def _extract_pages(source: Union[bytes, str], laparams: Optional[LAParams], page_numbers=None, max_pages: int = 0) -> str:
+    with _open_source(source) as fp:
+        if max_pages:
+            # walking the page tree is cheap next to laying the pages out
+            pages = sum(1 for _ in PDFPage.get_pages(fp, page_numbers))
+            if pages > max_pages:
+                raise PDFLimitError(f"PDF has {pages} pages, the limit is {max_pages}")
+            fp.seek(0)
+        return _render_text(fp, laparams, page_numbers)
+
+def _extract_share(
+    source: Union[bytes, str],
+    laparams: Optional[LAParams],
+    share: int,
+    shares: int,
+    max_pages: int = 0,
+    min_split_pages: int = 0
+) -> str:
+    """Text of the ``share``-th of ``shares`` contiguous page ranges.
+
+    Every worker counts the pages itself, so splitting a document needs no
+    round trip of its own. A document shorter than ``min_split_pages`` is
+    extracted whole by share 0 and the other shares come back empty.
+    """
+    with _open_source(source) as fp:
+        pages = sum(1 for _ in PDFPage.get_pages(fp))
+        if max_pages and pages > max_pages:
+            raise PDFLimitError(f"PDF has {pages} pages, the limit is {max_pages}")
+        if shares == 1 or pages < min_split_pages:
+            if share:
+                return ""
+            fp.seek(0)
+            return _render_text(fp, laparams)
+
+        size = -(-pages // shares)
+        first, last = share * size, min(pages, (share + 1) * size)
+        if first >= last:
+            return ""
+        fp.seek(0)
+        return _render_text(fp, laparams, range(first, last))
+
+class _OpenDocument:
+    """A spooled upload kept open by a worker for page-by-page extraction.
+
+    The document is parsed once and its page tree walked only as far as
+    the pages asked for, so streaming an N-page upload costs one parse per
+    worker instead of one per page.
+    """
+
+    def __init__(self, path: str, key: tuple):
+        self.key = key
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.document = PDFDocument(PDFParser(self._data), caching=True)
+        except BaseException:
+            self.close()
+            raise
+        self.resources = PDFResourceManager(caching=True)
+        self._tree = PDFPage.create_pages(self.document)
+        self._pages = []
+
+    def page(self, page_number: int) -> PDFPage:
+        while len(self._pages) <= page_number:
+            page = next(self._tree, None)
+            if page is None:
+                raise PDFException(f"Page {page_number + 1} is outside the document")
+            self._pages.append(page)
+        return self._pages[page_number]
+
+    def close(self):
+        if getattr(self, "_data", None) is not None:
+            self._data.close()
+        self._file.close()
+
+# the upload this worker last extracted a page from; replaced (and closed)
+# when a page of another upload comes in
+_open_document = None
+
+def _extract_page(path: str, laparams: Optional[LAParams], page_number: int) -> str:
+    global _open_document
+    stat = os.stat(path)
+    # spooled paths can be reused once an upload is removed
+    key = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    if _open_document is None or _open_document.key != key:
+        if _open_document is not None:
+            _open_document.close()
+            _open_document = None
+        _open_document = _OpenDocument(path, key)
+
+    document = _open_document
+    with io.StringIO() as output:
+        device = TextConverter(document.resources, output, codec='utf-8', laparams=laparams)
+        PDFPageInterpreter(document.resources, device).process_page(document.page(page_number))
+        return output.getvalue()
+
+def document_key(content: bytes) -> str:
+    """Identifies an upload by its bytes, whatever the file name"""
+    return hashlib.sha256(content).hexdigest()
+
+def parse_page_range(spec: Optional[str]) -> Optional[List[int]]:
+    """Turn a 1-based range like "1-3,5" into sorted 0-based page numbers"""
+    if not spec:
+        return None
+
+    pages = set()
+    try:
+        for part in spec.split(","):
+            part = part.strip()
+            if "-" in part:
+                first, last = (int(bound) for bound in part.split("-", 1))
+            else:
+                first = last = int(part)
+            if first < 1 or last < first:
+                raise ValueError(part)
+            pages.update(range(first - 1, last))
+    except ValueError:
+        raise PDFException(f"Invalid page range: {spec}")
+    return sorted(pages)
+
+# backoff between extraction attempts; only PDFTransientError is retried
+RETRY_ATTEMPTS = 3
+RETRY_MAX_WAIT = 2.0
+
+def _record_retry(retry_state):
+    RETRIES.labels(operation="pdf_extract").inc()
+    stage("pdf_retry_backoff").observe(retry_state.next_action.sleep)
+
+def _stop_before_deadline(deadline: Deadline):
+    # don't start a backoff the deadline would cut short
+    def stop(retry_state) -> bool:
+        remaining = deadline.remaining()
+        return remaining is not None and remaining < RETRY_MAX_WAIT
+    return stop
+
 class PDFService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 8,
+        cache: ResultCache = None,
+        max_upload_bytes: int = 20 * 1024 * 1024,
+        max_pages: int = 100,
+        parallel_min_pages: int = 8,
+        similarity: SimilarityIndex = None,
+        max_tasks_per_worker: int = 0,
+        task_memory_limit: int = 0,
+        max_worker_rss: int = 0
+    ):
         self.logger = logger.bind(service="PDFService")
-        self.laparams = LAParams(
-            line_overlap=0.5,
-            char_margin=2.0,
-            line_margin=0.5,
-            word_margin=0.1,
-            boxes_flow=0.5,
-            detect_vertical=True,
-            all_texts=True
+        self.laparams = EXTRACTION_PROFILES[DEFAULT_PROFILE]
+        self.pool = WorkerPool(
+            "pdf",
+            max_workers=max_workers,
+            max_queue=max_queue,
+            max_tasks_per_child=max_tasks_per_worker,
+            task_memory_limit=task_memory_limit,
+            max_rss=max_worker_rss
         )
+        self.cache = cache or ResultCache("pdf")
+        self.max_upload_bytes = max_upload_bytes
+        self.max_pages = max_pages
+        # documents at least this long are split across workers
+        self.parallel_min_pages = parallel_min_pages
+        # text of freshly parsed whole documents is fingerprinted here
+        self.similarity = similarity
+        self._profile_keys = {
+            name: hashlib.sha256(
+                repr(sorted(vars(laparams).items()) if laparams else None).encode()
+            ).hexdigest()[:16]
+            for name, laparams in EXTRACTION_PROFILES.items()
+        }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((PDFSyntaxError, PDFException))
-    )
-    async def extract_text(self, content: bytes) -> str:
-        try:
-            pdf_file = io.BytesIO(content)
-            text = extract_text(
-                pdf_file,
-                codec='utf-8',
-                laparams=self.laparams
+    def _laparams(self, profile: str) -> Optional[LAParams]:
+        if profile not in EXTRACTION_PROFILES:
+            raise PDFException(
+                f"Unknown extraction profile: {profile} (expected one of {', '.join(EXTRACTION_PROFILES)})"
+            )
+        return EXTRACTION_PROFILES[profile]
+
+    def _cache_key(self, content: bytes, profile: str, page_numbers: Optional[List[int]]) -> str:
+        # same bytes parsed with the same LAParams always give the same text
+        key = f"{document_key(content)}-{self._profile_keys[profile]}"
+        if page_numbers is not None:
+            key += "-" + hashlib.sha256(repr(page_numbers).encode()).hexdigest()[:8]
+        return key
+
+    async def extract_text(
+        self,
+        content: bytes,
+        profile: str = DEFAULT_PROFILE,
+        pages: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        wait_for_worker: bool = False
+    ) -> str:
+        """Extract the text of a PDF.
+
+        By default a full pool raises PoolSaturatedError; background work
+        sets ``wait_for_worker`` to queue for a free worker instead.
+        """
+        laparams = self._laparams(profile)
+        page_numbers = parse_page_range(pages)
+        if len(content) > self.max_upload_bytes:
+            LIMIT_REJECTIONS.labels(kind="pdf", limit="bytes").inc()
+            raise PDFLimitError(f"PDF exceeds the {self.max_upload_bytes} byte upload limit")
+
+        key = self._cache_key(content, profile, page_numbers)
+        text = await self.cache.get(key)
+        if text is not None:
+            self.logger.info("Serving PDF text from cache", key=key)
+            return text
+
+        text = await self._run_extraction(content, laparams, page_numbers, deadline or Deadline(None), wait_for_worker)
+        await self.cache.set(key, text)
+        if self.similarity is not None and page_numbers is None:
+            await asyncio.to_thread(self.similarity.add, document_key(content), text)
+        return text
+
+    def _split_pages(self, page_numbers: List[int], chunks: int) -> List[List[int]]:
+        chunks = min(chunks, len(page_numbers))
+        size = -(-len(page_numbers) // chunks)
+        return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+    async def _extract_parallel(
+        self,
+        content: bytes,
+        laparams: Optional[LAParams],
+        page_numbers: Optional[List[int]],
+        wait_for_worker: bool = False
+    ) -> str:
+        if self.pool.max_workers < 2:
+            return await self.pool.run(
+                _extract_pages, content, laparams, page_numbers, self.max_pages, wait=wait_for_worker
             )
+
+        # contiguous page ranges, one per worker that is idle right now:
+        # more would only queue behind other requests. pdfminer ends every
+        # page with a form feed, so joining the ranges in order gives the
+        # same text as one sequential pass
+        shares = max(1, min(self.pool.max_workers, self.pool.idle_workers))
+        if page_numbers is None:
+            tasks = [
+                (_extract_share, content, laparams, share, shares, self.max_pages, self.parallel_min_pages)
+                for share in range(shares)
+            ]
+        else:
+            if len(page_numbers) > self.max_pages:
+                raise PDFLimitError(f"PDF has {len(page_numbers)} pages, the limit is {self.max_pages}")
+            if len(page_numbers) < self.parallel_min_pages:
+                shares = 1
+            tasks = [(_extract_pages, content, laparams, chunk) for chunk in self._split_pages(page_numbers, shares)]
+        if len(tasks) > 1:
+            self.logger.info("Extracting PDF in parallel", chunks=len(tasks))
+
+        # the first range is the request's own admission; the others only
+        # take workers the pool still has free
+        runs = [asyncio.ensure_future(self.pool.run(*tasks[0], wait=wait_for_worker))]
+        runs += [asyncio.ensure_future(self._run_spare(*task)) for task in tasks[1:]]
+        try:
+            return "".join(await asyncio.gather(*runs))
+        finally:
+            for run in runs:
+                run.cancel()
+
+    async def _run_spare(self, fn, *args) -> str:
+        try:
+            return await self.pool.run(fn, *args)
+        except PoolSaturatedError:
+            # the worker that looked idle was taken in the meantime
+            return await self.pool.run(fn, *args, wait=True)
+
+    async def _run_extraction(
+        self,
+        content: bytes,
+        laparams: Optional[LAParams],
+        page_numbers: Optional[List[int]],
+        deadline: Deadline,
+        wait_for_worker: bool = False
+    ) -> str:
+        # a PDF that fails to parse or holds no text fails the same way every
+        # time, so only a crashed worker is worth another attempt
+        retrying = AsyncRetrying(
+            stop=stop_any(stop_after_attempt(RETRY_ATTEMPTS), _stop_before_deadline(deadline)),
+            wait=wait_exponential(multiplier=0.5, min=0.5, max=RETRY_MAX_WAIT),
+            retry=retry_if_exception_type(PDFTransientError),
+            before_sleep=_record_retry,
+            reraise=True
+        )
+        async for attempt in retrying:
+            with attempt:
+                return await self._extract_once(content, laparams, page_numbers, deadline, wait_for_worker)
+
+    async def _extract_once(
+        self,
+        content: bytes,
+        laparams: Optional[LAParams],
+        page_numbers: Optional[List[int]],
+        deadline: Deadline,
+        wait_for_worker: bool = False
+    ) -> str:
+        try:
+            with stage("pdf_layout").time():
+                # pages still queued for a worker are cancelled when the
+                # deadline passes; a page already being laid out runs to the end
+                text = await deadline.wait(
+                    self._extract_parallel(content, laparams, page_numbers, wait_for_worker), "PDF extraction"
+                )
             
             if not text.strip():
                 raise PDFException("No text content extracted from PDF")
                 
             return text.strip()
 
+        except (PoolSaturatedError, DeadlineExceeded):
+            raise
+        except PDFLimitError:
+            LIMIT_REJECTIONS.labels(kind="pdf", limit="pages").inc()
+            raise
+        except MemoryError:
+            raise self._memory_exceeded()
+        except BrokenProcessPool as e:
+            self.logger.warning("PDF worker crashed", error=str(e))
+            raise PDFTransientError(f"PDF worker crashed: {str(e)}")
         except PDFSyntaxError as e:
             self.logger.error("PDF syntax error", error=str(e))
             raise PDFException(f"Invalid PDF structure: {str(e)}")
         except Exception as e:
             self.logger.error("Unexpected error during PDF extraction", error=str(e))
             raise PDFException(f"Failed to process PDF: {str(e)}")
+
+    def _memory_exceeded(self) -> PDFLimitError:
+        LIMIT_REJECTIONS.labels(kind="pdf", limit="memory").inc()
+        self.logger.warning("PDF worker ran out of memory", limit=self.pool.task_memory_limit)
+        return PDFLimitError(f"PDF needs more than {self.pool.task_memory_limit >> 20} MB to extract")
+
+    async def spool(self, read_chunk, chunk_size: int = 1024 * 1024) -> str:
+        """Copy an upload to a temp file chunk by chunk, enforcing the size limit.
+
+        ``read_chunk`` is an async callable returning up to ``chunk_size`` bytes
+        (``b""`` at the end). The caller owns the returned path.
+        """
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = await read_chunk(chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        LIMIT_REJECTIONS.labels(kind="pdf", limit="bytes").inc()
+                        raise PDFLimitError(f"PDF exceeds the {self.max_upload_bytes} byte upload limit")
+                    f.write(chunk)
+            if size == 0:
+                raise PDFException("Uploaded PDF is empty")
+            return path
+        except BaseException:
+            os.remove(path)
+            raise
+
+    async def count_pages(self, path: str) -> int:
+        try:
+            pages = await self.pool.run(_count_pages, path)
+        except PoolSaturatedError:
+            raise
+        except Exception as e:
+            self.logger.error("Failed to read PDF page tree", error=str(e))
+            raise PDFException(f"Invalid PDF structure: {str(e)}")
+
+        if pages > self.max_pages:
+            LIMIT_REJECTIONS.labels(kind="pdf", limit="pages").inc()
+            raise PDFLimitError(f"PDF has {pages} pages, the limit is {self.max_pages}")
+        return pages
+
+    async def iter_pages(self, path: str, pages: int, profile: str = DEFAULT_PROFILE, page_range: Optional[str] = None):
+        """Yield (page_number, text) for a spooled PDF in page order.
+
+        Up to one page per worker is laid out ahead of the page being
+        yielded, so long documents use every worker while output stays
+        ordered. Workers keep the document open between its pages.
+        """
+        laparams = self._laparams(profile)
+        page_numbers = parse_page_range(page_range)
+        if page_numbers is None:
+            page_numbers = list(range(pages))
+        page_numbers = [page_number for page_number in page_numbers if page_number < pages]
+        if not page_numbers:
+            raise PDFException(f"Page range {page_range} is outside the document ({pages} pages)")
+
+        # the request was admitted when its pages were counted, so later
+        # pages queue for a worker instead of being rejected
+        def submit(page_number):
+            return asyncio.ensure_future(
+                self.pool.run(_extract_page, path, laparams, page_number, wait=True)
+            )
+
+        pending = deque()
+        upcoming = iter(page_numbers)
+        try:
+            for page_number in itertools.islice(upcoming, self.pool.max_workers):
+                pending.append((page_number, submit(page_number)))
+
+            while pending:
+                page_number, task = pending.popleft()
+                try:
+                    text = await task
+                except MemoryError:
+                    raise self._memory_exceeded()
+                except Exception as e:
+                    self.logger.error("Failed to extract PDF page", page=page_number + 1, error=str(e))
+                    raise PDFException(f"Failed to process page {page_number + 1}: {str(e)}")
+
+                next_page = next(upcoming, None)
+                if next_page is not None:
+                    pending.append((next_page, submit(next_page)))
+                yield page_number + 1, text.strip()
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def shutdown(self):
+        self.pool.shutdown()
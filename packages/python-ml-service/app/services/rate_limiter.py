@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+class HostRateLimiter:
+    """Token bucket per host.
+
+    Each host refills at ``rate`` requests per second up to ``burst`` tokens;
+    ``acquire`` waits without blocking the loop until a token is available.
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets = {}
+
+    async def acquire(self, host: str):
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[host] = (tokens - 1, now)
+                return
+            self._buckets[host] = (tokens, now)
+            await asyncio.sleep((1 - tokens) / self.rate)
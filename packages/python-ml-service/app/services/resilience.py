@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time; nobody is waiting for the result any more"""
+    pass
+
+class CircuitOpenError(Exception):
+    """Calls are being short-circuited because the dependency keeps failing"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class Deadline:
+    """Absolute point in time by which a request must be answered.
+
+    Every timeout and retry on the request path should be capped with
+    ``remaining()`` so work stops once the caller has given up.
+    """
+
+    HEADER = "X-Request-Timeout-Ms"
+
+    def __init__(self, timeout: Optional[float]):
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+
+    @classmethod
+    def from_headers(cls, headers, default: float, maximum: float) -> "Deadline":
+        """Use the caller's budget from ``X-Request-Timeout-Ms`` when given"""
+        value = headers.get(cls.HEADER)
+        if value is None:
+            return cls(default)
+        try:
+            timeout = float(value) / 1000
+        except ValueError:
+            return cls(default)
+        return cls(min(max(timeout, 0.0), maximum))
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, what: str):
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def cap(self, timeout: float) -> float:
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def extend(self, other: "Deadline"):
+        """Push this deadline out to ``other``'s when that one is later"""
+        if self.expires_at is not None and (other.expires_at is None or other.expires_at > self.expires_at):
+            self.expires_at = other.expires_at
+
+    async def wait(self, awaitable, what: str):
+        """Await ``awaitable`` for at most the remaining time"""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline exceeded during {what}")
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    closed    calls pass; ``failure_threshold`` failures in a row open it
+    open      calls fail immediately with CircuitOpenError for ``reset_timeout``
+    half_open one trial call is let through; success closes, failure reopens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.logger = logger.bind(circuit=name)
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_started = None
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        if self.state == self.CLOSED:
+            return
+
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.logger.info("Circuit half-open, letting a trial call through")
+
+        # a trial that never reported back (cancelled, deadline passed) stops
+        # blocking new trials after reset_timeout
+        if self.state == self.HALF_OPEN and (
+            self._trial_started is None or now - self._trial_started >= self.reset_timeout
+        ):
+            self._trial_started = now
+            return
+
+        self.rejected += 1
+        started = self._trial_started if self.state == self.HALF_OPEN else self.opened_at
+        raise CircuitOpenError(self.name, max(0.0, self.reset_timeout - (now - started)))
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            self.logger.info("Circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.logger.warning("Circuit opened", failures=self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
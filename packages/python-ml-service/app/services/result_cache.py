@@ -0,0 +1,188 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_SAFE_KEY = re.compile(r"[A-Za-z0-9_-]{2,128}")
+
+class ResultCache:
+    """Two-tier result cache.
+
+    A bounded in-memory LRU sits in front of an optional on-disk tier that
+    survives restarts and is shared by every server process pointed at the
+    same directory. Entries expire after ``ttl`` seconds in both tiers and
+    the disk tier is pruned oldest-first once it grows past ``disk_max_bytes``.
+    Values must be JSON serialisable; ``None`` is reserved for a miss.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 128,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.logger = logger.bind(cache=name)
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    async def get(self, key: str) -> Any:
+        value = self._memory_get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._memory_set(key, entry["value"], entry["expires_at"])
+                return entry["value"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = self._expiry(ttl)
+        self._memory_set(key, value, expires_at)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def _memory_get(self, key: str) -> Any:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: Any, expires_at: Optional[float]):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        # keys can come from request input (job IDs); anything that isn't a
+        # plain file name is hashed so it can't point outside the cache
+        if not _SAFE_KEY.fullmatch(key):
+            key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[dict]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning("Dropping unreadable cache entry", path=path, error=str(e))
+            self._disk_remove(path)
+            return None
+
+        if entry["expires_at"] is not None and entry["expires_at"] <= time.time():
+            self._disk_remove(path)
+            return None
+        return entry
+
+    def _disk_set(self, key: str, value: Any, expires_at: Optional[float]):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps({"expires_at": expires_at, "value": value})
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+
+        # write-then-rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning("Failed to write cache entry", path=path, error=str(e))
+            # never counted in _disk_bytes, so not _disk_remove()
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return
+
+        self._disk_bytes += len(payload.encode("utf-8")) - previous
+        if self._disk_bytes > self.disk_max_bytes:
+            self._prune_disk()
+
+    def _disk_remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _prune_disk(self):
+        entries = sorted(self._scan_disk(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        # leave some headroom so we don't rescan on every write
+        target = self.disk_max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+        self.logger.info("Pruned disk cache", bytes=total)
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+import structlog
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows; snapshots are merged without a lock there
+    fcntl = None
+
+logger = structlog.get_logger(__name__)
+
+BITS = 64
+_WORD = re.compile(r"\w+")
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over lowercased word shingles, weighted by frequency.
+
+    Lightly edited copies of a document differ in only a few bits.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = Counter([" ".join(words)])
+    else:
+        shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    # weight per byte value at each of the 8 byte positions; summing those
+    # per bit afterwards is much cheaper than testing 64 bits per shingle
+    counts = [[0] * 256 for _ in range(8)]
+    total = 0
+    for shingle, weight in shingles.items():
+        total += weight
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for position, byte in enumerate(digest):
+            counts[position][byte] += weight
+
+    fingerprint = 0
+    for position, by_value in enumerate(counts):
+        present = [(value, weight) for value, weight in enumerate(by_value) if weight]
+        for bit in range(8):
+            # a bit is set when the shingles that have it outweigh those that don't
+            if 2 * sum(weight for value, weight in present if value >> bit & 1) > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class SimilarityIndex:
+    """Bounded index of SimHash fingerprints for near-duplicate lookups.
+
+    Fingerprints are split into ``max_distance + 1`` bands; two fingerprints
+    that differ in at most ``max_distance`` bits agree exactly on at least
+    one band, so a lookup only compares against documents sharing a band
+    value instead of scanning the whole index. The least recently added
+    documents are dropped past ``max_entries``. With a ``snapshot_path``,
+    ``sync()`` merges the index with that file, so server workers sharing it
+    see each other's documents and the index survives restarts. Workers
+    merge one at a time under a lock on ``<snapshot_path>.lock``.
+    """
+
+    def __init__(self, name: str, max_entries: int = 50000, max_distance: int = 5, snapshot_path: str = None):
+        self.logger = logger.bind(index=name)
+        self.name = name
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.snapshot_path = snapshot_path
+        bands = max_distance + 1
+        width = -(-BITS // bands)
+        self._bands = [(shift, (1 << width) - 1) for shift in range(0, BITS, width)]
+        self._tables = [{} for _ in self._bands]
+        self._fingerprints = OrderedDict()
+        # keys dropped for space, so sync() doesn't adopt them straight back
+        self._evicted = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._snapshot_mtime = None
+
+        if snapshot_path:
+            self.sync()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def fingerprint_of(self, key: str) -> Optional[int]:
+        return self._fingerprints.get(key)
+
+    def add(self, key: str, text: str) -> int:
+        fingerprint = simhash(text)
+        self.add_fingerprint(key, fingerprint)
+        return fingerprint
+
+    def add_fingerprint(self, key: str, fingerprint: int):
+        with self._lock:
+            self._evicted.pop(key, None)
+            self._insert(key, fingerprint)
+            self._dirty = True
+
+    def _insert(self, key: str, fingerprint: int):
+        self._remove(key)
+        self._fingerprints[key] = fingerprint
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            table.setdefault(fingerprint >> shift & mask, set()).add(key)
+        while len(self._fingerprints) > self.max_entries:
+            evicted = next(iter(self._fingerprints))
+            self._remove(evicted)
+            self._evicted[evicted] = None
+            if len(self._evicted) > self.max_entries:
+                self._evicted.popitem(last=False)
+
+    def _remove(self, key: str):
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            band = fingerprint >> shift & mask
+            keys = table.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del table[band]
+
+    def query(self, fingerprint: int, exclude: str = None, limit: int = 5) -> List[Tuple[str, int]]:
+        """(key, differing bits) of indexed near-duplicates, closest first"""
+        with self._lock:
+            candidates = set()
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                candidates.update(table.get(fingerprint >> shift & mask, ()))
+            candidates.discard(exclude)
+            matches = [(key, hamming(fingerprint, self._fingerprints[key])) for key in candidates]
+        matches = [match for match in matches if match[1] <= self.max_distance]
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:limit]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._fingerprints), "max_entries": self.max_entries}
+
+    def sync(self):
+        """Adopt documents other workers saved to the snapshot and write ours back"""
+        if not self.snapshot_path:
+            return
+
+        # without the lock two workers could read the same snapshot and the
+        # later write would drop the other's documents
+        with self._snapshot_lock():
+            saved = self._read_snapshot()
+            with self._lock:
+                adopted = 0
+                for key, fingerprint in saved:
+                    if key not in self._fingerprints and key not in self._evicted:
+                        self._insert(key, int(fingerprint, 16))
+                        adopted += 1
+                dirty, self._dirty = self._dirty, False
+                entries = [[key, f"{fingerprint:016x}"] for key, fingerprint in self._fingerprints.items()]
+
+            if adopted:
+                self.logger.info("Loaded fingerprints", count=adopted, path=self.snapshot_path)
+            if dirty:
+                self._write_snapshot(entries)
+
+    @contextmanager
+    def _snapshot_lock(self):
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.snapshot_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.snapshot_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_snapshot(self) -> list:
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+            if mtime == self._snapshot_mtime:
+                return []
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Ignoring unreadable similarity snapshot", path=self.snapshot_path, error=str(e))
+            return []
+        self._snapshot_mtime = mtime
+        return entries[-self.max_entries:]
+
+    def _write_snapshot(self, entries: list):
+        directory = os.path.dirname(self.snapshot_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f)
+            os.replace(tmp_path, self.snapshot_path)
+            # our own write holds nothing new to adopt
+            self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+        except OSError as e:
+            self.logger.warning("Failed to write similarity snapshot", path=self.snapshot_path, error=str(e))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.logger.info("Saved fingerprints", count=len(entries), path=self.snapshot_path)
@@ -0,0 +1,28 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one in-flight task.
+
+    The first caller for a key starts the work; everyone else arriving before
+    it finishes awaits the same task and gets the same result or exception.
+    ``do`` starts or joins the task before returning, so a caller can act on
+    the flight (see JobScraper.scrape) before it first awaits.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            # if every caller gave up, nobody else reads the outcome
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        # a caller going away must not cancel the work others are waiting on
+        return asyncio.shield(task)
@@ -0,0 +1,230 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import List, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_DICTIONARY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json")
+
+# characters that make a neighbouring letter part of a longer name, so "R"
+# doesn't match in "R&D" and "C" doesn't match in "C++"
+_JOINERS = frozenset("_+#&")
+
+# punctuation ending a sentence; the next word is capitalised whatever it is
+_SENTENCE_ENDS = frozenset(".!?…")
+
+# exact-case names that also open ordinary sentences ("Spark of creativity",
+# "Go home", "React to feedback"); see SkillMatcher
+SENTENCE_START_WORDS = frozenset((
+    "Bootstrap", "Chef", "Dart", "Express", "Flutter", "Go", "Helm", "Jest",
+    "Puppet", "React", "Remix", "Rust", "Spark", "Swift", "Vault",
+))
+# words that follow those names in prose but hardly ever in a skill list
+_PROSE_FOLLOWERS = frozenset((
+    "a", "an", "the", "this", "that", "these", "those",
+    "my", "our", "your", "his", "her", "its", "their",
+    "of", "to", "for", "from", "in", "into", "on", "at", "by", "with",
+    "up", "out", "away", "back", "ahead", "home",
+))
+_NEXT_WORD = re.compile(r"[ \t]+([a-z]+)\b")
+
+class SkillDictionaryError(Exception):
+    """The skill dictionary file is missing or malformed"""
+    pass
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # a few characters (e.g. "İ") lowercase to two; keep offsets aligned
+        lowered = "".join(ch.lower()[:1] for ch in text)
+    return lowered
+
+def _joined(ch: str) -> bool:
+    return ch.isalnum() or ch in _JOINERS
+
+def _starts_sentence(text: str, start: int) -> bool:
+    """Whether ``start`` follows a sentence end on the same line"""
+    i = start
+    while i > 0 and text[i - 1] in " \t":
+        i -= 1
+    return 0 < i < start and text[i - 1] in _SENTENCE_ENDS
+
+def _reads_as_prose(text: str, start: int, end: int) -> bool:
+    """Whether the word at ``start:end`` opens a sentence and is followed by
+    a word that makes it read as ordinary English"""
+    following = _NEXT_WORD.match(text, end)
+    return following is not None and following.group(1) in _PROSE_FOLLOWERS and _starts_sentence(text, start)
+
+class SkillMatcher:
+    """Aho-Corasick automaton over skill names and aliases.
+
+    ``patterns`` are (text, skill index, exact) tuples. One pass over a
+    document finds every occurrence of every pattern; a match counts only
+    when it isn't glued to a letter or digit on either side, so "Go" doesn't
+    match inside "Google". An exact pattern from SENTENCE_START_WORDS is
+    also skipped where it opens a sentence and is followed by a word such as
+    "of" or "to": "Spark of creativity" is prose, "Spark and Kafka" isn't.
+    """
+
+    def __init__(self, patterns: List[Tuple[str, int, bool]]):
+        self.patterns = patterns
+        self._ambiguous = [exact and text in SENTENCE_START_WORDS for text, _, exact in patterns]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern_id, (text, _, _) in enumerate(patterns):
+            self._add(_lower(text), pattern_id)
+        self._link()
+
+    def _add(self, text: str, pattern_id: int):
+        node = 0
+        for ch in text:
+            child = self._goto[node].get(ch)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = child
+            node = child
+        self._out[node].append(pattern_id)
+
+    def _link(self):
+        # breadth first, so every failure target is finished before it's used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """Non-overlapping (start, end, skill index) matches, leftmost-longest"""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        ambiguous = self._ambiguous
+        candidates = []
+        node = 0
+        for end, ch in enumerate(_lower(text), start=1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in out[node]:
+                pattern, skill, exact = patterns[pattern_id]
+                start = end - len(pattern)
+                if exact and text[start:end] != pattern:
+                    continue
+                if ambiguous[pattern_id] and _reads_as_prose(text, start, end):
+                    continue
+                if pattern[0].isalnum() and start > 0 and _joined(text[start - 1]):
+                    continue
+                if pattern[-1].isalnum() and end < len(text) and _joined(text[end]):
+                    continue
+                candidates.append((start, end, skill))
+
+        # "React Native" wins over the "React" inside it
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        covered = 0
+        for start, end, skill in candidates:
+            if start >= covered:
+                matches.append((start, end, skill))
+                covered = end
+        return matches
+
+class SkillExtractor:
+    """Skill dictionary compiled into a SkillMatcher.
+
+    The dictionary file maps category -> {skill name: [aliases]}. Names and
+    aliases match case-insensitively; prefix one with "=" to require the
+    exact case, for names like "Go" or "REST" that are also ordinary words.
+    The file is re-read when it changes on disk (checked at most every
+    ``check_interval`` seconds), so every server worker picks up edits
+    without a restart.
+    """
+
+    def __init__(self, path: str = DEFAULT_DICTIONARY, check_interval: float = 5.0):
+        self.logger = logger.bind(service="SkillExtractor")
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        # (matcher, [(skill name, category)]) swapped as one reference
+        self._compiled = None
+        self.load()
+
+    def load(self) -> dict:
+        """(Re)compile the dictionary; the previous one stays active on error"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                with open(self.path, "r", encoding="utf-8") as f:
+                    dictionary = json.load(f)
+                skills, patterns = self._compile(dictionary)
+            except (OSError, ValueError, AttributeError, TypeError) as e:
+                raise SkillDictionaryError(f"Cannot load skill dictionary {self.path}: {str(e)}")
+
+            self._compiled = (SkillMatcher(patterns), skills)
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            self.logger.info("Loaded skill dictionary", skills=len(skills), patterns=len(patterns))
+            return {"skills": len(skills), "patterns": len(patterns)}
+
+    @staticmethod
+    def _compile(dictionary: dict):
+        skills, patterns = [], []
+        for category, entries in dictionary.items():
+            for name, aliases in entries.items():
+                skill = len(skills)
+                skills.append((name.lstrip("="), category))
+                for alias in [name, *aliases]:
+                    exact = alias.startswith("=")
+                    alias = alias[1:] if exact else alias
+                    if alias.strip():
+                        patterns.append((alias, skill, exact))
+        return skills, patterns
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                self.load()
+            except SkillDictionaryError as e:
+                # keep serving the old dictionary; retry once the file changes again
+                self._mtime = mtime
+                self.logger.error(str(e))
+
+    def extract(self, text: str) -> dict:
+        """Matched skills with counts and [start, end) character offsets"""
+        self._refresh()
+        matcher, skills = self._compiled
+
+        found = {}
+        for start, end, skill in matcher.find(text):
+            found.setdefault(skill, []).append([start, end])
+
+        # most mentioned first, ties in order of first mention
+        ordered = sorted(found.items(), key=lambda item: (-len(item[1]), item[1][0][0]))
+        categories = {}
+        results = []
+        for skill, positions in ordered:
+            name, category = skills[skill]
+            categories.setdefault(category, []).append(name)
+            results.append({"skill": name, "category": category, "count": len(positions), "positions": positions})
+        return {"skills": results, "categories": categories}
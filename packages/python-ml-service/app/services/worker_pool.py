@@ -0,0 +1,284 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool, _ExceptionWithTraceback, _sendback_result
+import structlog
+from .memory import limit_heap, peak_rss_bytes, reset_peak_rss, rss_bytes
+from ..metrics import RECYCLES, TASK_MEMORY_BYTES
+
+logger = structlog.get_logger(__name__)
+
+class PoolSaturatedError(Exception):
+    """Raised when a worker pool cannot admit more work"""
+    pass
+
+# the rest of the module runs inside pool workers
+
+# heap limit still to be applied in this worker
+_pending_heap_limit = 0
+_max_tasks = 0
+_max_rss = 0
+_tasks_run = 0
+# why this worker exits after its current task, if it does
+_retire_reason = None
+
+def _init_worker(task_memory_limit: int, max_tasks: int, max_rss: int):
+    global _pending_heap_limit, _max_tasks, _max_rss
+    _pending_heap_limit = task_memory_limit
+    _max_tasks = max_tasks
+    _max_rss = max_rss
+
+def _run_measured(fn, args):
+    """``fn(*args)`` with the worker's peak RSS during the call, its RSS after
+    and the reason it retires after this task (None if it stays)"""
+    global _pending_heap_limit, _tasks_run, _retire_reason
+    if _pending_heap_limit:
+        # only now, since unpickling ``fn`` imports its module (pdfminer
+        # and its libraries) and that shouldn't count against the limit
+        limit_heap(_pending_heap_limit)
+        _pending_heap_limit = 0
+    reset_peak_rss()
+    _tasks_run += 1
+    try:
+        result = fn(*args)
+    except MemoryError:
+        # the heap may be left fragmented right up to the limit
+        _retire_reason = "memory_limit"
+        raise
+    rss = rss_bytes()
+    if _max_rss and rss > _max_rss:
+        _retire_reason = "rss"
+    elif _max_tasks and _tasks_run >= _max_tasks:
+        _retire_reason = "max_tasks"
+    return result, peak_rss_bytes(), rss, _retire_reason
+
+def _process_worker(call_queue, result_queue, initializer, initargs, max_tasks=None):
+    """concurrent.futures' worker loop, except that the worker exits after
+    any task that sets ``_retire_reason``. The executor then starts a
+    replacement, as it does for ``max_tasks_per_child``."""
+    if initializer is not None:
+        try:
+            initializer(*initargs)
+        except BaseException:
+            # the executor notices the process stopped and marks the pool broken
+            return
+    while True:
+        call_item = call_queue.get(block=True)
+        if call_item is None:
+            # wake up the executor's management thread
+            result_queue.put(os.getpid())
+            return
+
+        try:
+            r = call_item.fn(*call_item.args, **call_item.kwargs)
+        except BaseException as e:
+            exit_pid = os.getpid() if _retire_reason else None
+            exc = _ExceptionWithTraceback(e, e.__traceback__)
+            _sendback_result(result_queue, call_item.work_id, exception=exc, exit_pid=exit_pid)
+        else:
+            exit_pid = os.getpid() if _retire_reason else None
+            _sendback_result(result_queue, call_item.work_id, result=r, exit_pid=exit_pid)
+            del r
+        del call_item
+
+        if exit_pid is not None:
+            return
+
+class _RecyclingExecutor(ProcessPoolExecutor):
+    """ProcessPoolExecutor running ``_process_worker``, so single workers
+    can retire without the rest of the pool"""
+
+    def _spawn_process(self):
+        p = self._mp_context.Process(
+            target=_process_worker,
+            args=(self._call_queue, self._result_queue, self._initializer, self._initargs)
+        )
+        p.start()
+        self._processes[p.pid] = p
+
+    def _adjust_process_count(self):
+        # the stock version skips the spawn when it can take an idle-worker
+        # credit, and retired workers leave such credits behind: the pool
+        # then shrinks until nothing is left to run the queued tasks
+        while len(self._processes) < self._max_workers:
+            self._spawn_process()
+
+class WorkerPool:
+    """Process pool with a bounded admission queue.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more
+    wait for a free worker; anything beyond that is rejected immediately with
+    ``PoolSaturatedError`` so callers can shed load instead of piling up.
+
+    Memory is reclaimed by replacing workers: a worker exits after
+    ``max_tasks_per_child`` tasks, after a task that left it holding more
+    than ``max_rss`` bytes and after a task that ran out of memory, and a
+    fresh one takes its place. A worker may allocate ``task_memory_limit``
+    bytes beyond its baseline before allocations fail with MemoryError.
+    Zero turns each of these off. The whole pool is only replaced once it
+    is broken, i.e. a worker died.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        max_tasks_per_child: int = 0,
+        task_memory_limit: int = 0,
+        max_rss: int = 0
+    ):
+        self.logger = logger.bind(pool=name)
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.task_memory_limit = task_memory_limit
+        self.max_rss = max_rss
+        self._executor = None
+        self._admitted = 0
+        self._lock = threading.Lock()
+        # callers of run(wait=True) waiting for a slot, woken in order
+        self._waiters = deque()
+        self._loop = None
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._admitted
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._admitted - self.max_workers)
+
+    @property
+    def idle_workers(self) -> int:
+        return max(0, self.max_workers - self._admitted)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps workers independent of whatever threads the server
+            # process has running when the pool is first used
+            self._executor = _RecyclingExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.task_memory_limit, self.max_tasks_per_child, self.max_rss)
+            )
+            self.logger.info("Started worker pool", workers=self.max_workers, queue=self.max_queue)
+        return self._executor
+
+    def _release(self, _future):
+        # called from the executor's thread when a task finishes
+        with self._lock:
+            self._admitted -= 1
+            waiting = bool(self._waiters)
+        if waiting:
+            try:
+                self._loop.call_soon_threadsafe(self._wake_waiter)
+            except RuntimeError:
+                # the loop has been closed
+                pass
+
+    def _wake_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _wait_for_slot(self, waiter: asyncio.Future):
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # pass on a wake-up this caller can no longer use
+            if waiter.done() and not waiter.cancelled():
+                self._wake_waiter()
+            raise
+
+    def _try_admit(self, waiter: asyncio.Future = None) -> bool:
+        """Admit a task if there is room, else queue ``waiter`` for the next free slot.
+
+        Both happen under the lock, so a slot freed in between can't go unnoticed.
+        """
+        with self._lock:
+            if self._admitted >= self.capacity:
+                if waiter is not None:
+                    self._waiters.append(waiter)
+                return False
+            self._admitted += 1
+            return True
+
+    async def run(self, fn, *args, wait: bool = False):
+        """Run ``fn(*args)`` in a worker.
+
+        When the pool is full this raises ``PoolSaturatedError``, unless
+        ``wait`` is set, in which case it waits for a free slot. Waiting is
+        meant for follow-up work of a request that was already admitted.
+        """
+        while True:
+            waiter = None
+            if wait:
+                self._loop = asyncio.get_running_loop()
+                waiter = self._loop.create_future()
+            if self._try_admit(waiter):
+                break
+            if not wait:
+                raise PoolSaturatedError(f"{self.name} pool is at capacity ({self.capacity} tasks)")
+            await self._wait_for_slot(waiter)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_run_measured, fn, args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._replace_broken(executor)
+            raise
+        except Exception:
+            self._release(None)
+            raise
+
+        # the slot is released when the worker finishes, not when the caller
+        # stops waiting, so abandoned requests still count against capacity
+        future.add_done_callback(self._release)
+        try:
+            result, peak_rss, rss, retired = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            raise
+        except MemoryError:
+            # the worker that raised it has retired
+            RECYCLES.labels(pool=self.name, reason="memory_limit").inc()
+            raise
+
+        TASK_MEMORY_BYTES.labels(pool=self.name).observe(peak_rss)
+        if retired:
+            if retired == "rss":
+                self.logger.info("Recycling worker over memory limit", rss=rss, limit=self.max_rss)
+            RECYCLES.labels(pool=self.name, reason=retired).inc()
+        return result
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        """Route new tasks to a fresh executor once a worker died (e.g. killed
+        for memory); the broken one is unusable and its queued tasks are
+        cancelled."""
+        if self._executor is not executor:
+            return
+        self.logger.warning("Replacing broken worker pool")
+        RECYCLES.labels(pool=self.name, reason="broken").inc()
+        self._executor = None
+        # not shutdown(wait=False): that drops the executor's process table
+        # while its manager thread may still replace a retired worker, which
+        # crashes the thread
+        threading.Thread(target=executor.shutdown, kwargs={"cancel_futures": True}, daemon=True).start()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
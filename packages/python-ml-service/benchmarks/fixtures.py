@@ -0,0 +1,195 @@
+"""Deterministic fixture corpus for the benchmarks.
+
+Everything is generated in memory so the suite runs offline and the inputs
+are identical between commits: resume PDFs written with a minimal PDF
+writer and saved-page lookalikes of LinkedIn job postings, one per path
+through JobScraper's extraction.
+"""
+import random
+
+SKILLS = [
+    "Python", "TypeScript", "NestJS", "FastAPI", "PostgreSQL", "Redis", "Docker",
+    "Kubernetes", "AWS", "Terraform", "React", "Next.js", "GraphQL", "RabbitMQ",
+    "Prometheus", "Grafana", "CI/CD", "Linux", "Go", "Rust",
+]
+WORDS = [
+    "built", "designed", "maintained", "scaled", "migrated", "service", "platform",
+    "pipeline", "team", "latency", "customers", "deployment", "feature", "across",
+    "improving", "reducing", "owning", "the", "and", "with", "for", "data",
+]
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS + SKILLS) for _ in range(words)).capitalize() + "."
+
+# ---------------------------------------------------------------- PDFs
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _write_pdf(page_streams, image=None):
+    """Assemble a PDF from per-page content streams (bytes).
+
+    ``image`` is an optional (width, height, gray_bytes) XObject available to
+    every page as /Im1.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    image_id = None
+    if image is not None:
+        width, height, pixels = image
+        image_id = len(objects) + 1
+        objects.append(
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length {len(pixels)} >>\nstream\n".encode()
+            + pixels + b"\nendstream"
+        )
+
+    resources = f"/Font << /F1 {font_id} 0 R >>"
+    if image_id:
+        resources += f" /XObject << /Im1 {image_id} 0 R >>"
+
+    kids = []
+    for stream in page_streams:
+        content_id = len(objects) + 1
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        page_id = len(objects) + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {content_id} 0 R /Resources << {resources} >> >>".encode()
+        )
+        kids.append(f"{page_id} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def _text_page(lines, columns=1):
+    ops = ["BT", "/F1 10 Tf", "12 TL"]
+    per_column = -(-len(lines) // columns)
+    for column in range(columns):
+        ops.append(f"1 0 0 1 {50 + column * 280} 740 Tm")
+        for line in lines[column * per_column:(column + 1) * per_column]:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode()
+
+def _resume_lines(rng, count):
+    lines = ["Jane Doe - Senior Software Engineer", "jane@example.com | github.com/janedoe", ""]
+    lines.append("Skills: " + ", ".join(rng.sample(SKILLS, 8)))
+    while len(lines) < count:
+        lines.append(f"- {_sentence(rng, rng.randint(6, 14))}")
+    return lines
+
+def resume_pdfs():
+    rng = random.Random(1)
+    small = _write_pdf([_text_page(_resume_lines(rng, 50))])
+    multi_page = _write_pdf([
+        _text_page(_resume_lines(rng, 55), columns=1 + page % 2)
+        for page in range(12)
+    ])
+    # a page that is only an image, as a scanner would produce
+    pixels = bytes(rng.randrange(256) for _ in range(200 * 260))
+    scanned = _write_pdf([b"q 560 0 0 728 26 32 cm /Im1 Do Q"] * 2, image=(200, 260, pixels))
+    malformed = small[: len(small) // 2]
+    return {
+        "small": small,
+        "multi_page": multi_page,
+        "scanned": scanned,
+        "malformed": malformed,
+    }
+
+# ---------------------------------------------------------- job pages
+
+def _filler(rng, cards=350):
+    """'Similar jobs' list and tracking markup that makes real pages heavy"""
+    items = []
+    for i in range(cards):
+        items.append(
+            f'<li><div class="base-card base-card--link job-search-card" data-entity-urn="urn:li:jobPosting:{i}">'
+            f'<a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{1000 + i}"><span class="sr-only">Role {i}</span></a>'
+            f'<div class="base-search-card__info"><h3 class="base-search-card__title">Engineer {i}</h3>'
+            f'<h4 class="base-search-card__subtitle">Company {i % 40}</h4>'
+            f'<div class="base-search-card__metadata"><span class="job-search-card__location">City {i % 25}</span>'
+            f'<time class="job-search-card__listdate">{1 + i % 28} days ago</time></div></div></div></li>'
+        )
+    return '<section class="similar-jobs"><ul class="similar-jobs__list">' + "".join(items) + "</ul></section>"
+
+def _head(rng):
+    tracking = ",".join(f'"k{i}":"{rng.random():.6f}"' for i in range(400))
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Job posting</title>"
+        "<style>.topcard{display:flex}.show-more-less-html{overflow:hidden}</style>"
+        f"<script type=\"application/json\">{{{tracking}}}</script></head>"
+    )
+
+def _top_card():
+    return (
+        '<section class="top-card-layout"><div class="top-card-layout__entity-info">'
+        '<img class="artdeco-entity-image artdeco-entity-image--square-5 lazy-loaded" '
+        'alt="Acme" data-delayed-url="https://media.licdn.com/dms/image/acme-logo.png">'
+        '<h4 class="top-card-layout__second-subline"><span class="topcard__flavor">'
+        '<a class="topcard__org-name-link topcard__flavor--black-link" href="#"> Acme Corp </a></span>'
+        '<span class="topcard__flavor topcard__flavor--bullet"> Berlin, Germany </span></h4>'
+        '<span class="posted-time-ago__text topcard__flavor--metadata"> 2 weeks ago </span>'
+        "</div></section>"
+    )
+
+def _description_body(rng, heading):
+    bullets = "".join(f"<li>{_sentence(rng)}</li>" for _ in range(14))
+    return (
+        f"<p>{_sentence(rng, 30)}</p><p><strong>{heading}</strong></p><ul>{bullets}</ul>"
+        f"<p>{_sentence(rng, 25)}</p>"
+    )
+
+def job_pages():
+    pages = {}
+
+    rng = random.Random(2)
+    pages["primary"] = (
+        _head(rng) + "<body>" + _top_card()
+        + '<section class="description"><div class="show-more-less-html__markup">'
+        + _description_body(rng, "Requirements") + "</div></section>"
+        + _filler(rng) + "</body></html>"
+    )
+
+    rng = random.Random(3)
+    pages["pattern_fallback"] = (
+        _head(rng) + "<body>" + _top_card()
+        + '<div class="jobs-description__content jobs-description-content">'
+        + _description_body(rng, "Requirements") + "</div>"
+        + _filler(rng) + "</body></html>"
+    )
+
+    rng = random.Random(4)
+    pages["keyword_fallback"] = (
+        _head(rng) + "<body>" + _top_card()
+        + "<main><article><h2>About the role</h2>"
+        + _description_body(rng, "Responsibilities") + "</article></main>"
+        + _filler(rng) + "</body></html>"
+    )
+
+    rng = random.Random(5)
+    long_text = " ".join(_sentence(rng, 20) for _ in range(12))
+    pages["largest_block"] = (
+        "<!DOCTYPE html><html><head><title>Job posting</title></head><body>" + _top_card()
+        + f"<div><div><p>{long_text}</p></div></div>"
+        + _filler(rng) + "</body></html>"
+    )
+
+    rng = random.Random(6)
+    pages["not_found"] = (
+        "<!DOCTYPE html><html><head><title>Job posting</title></head><body>"
+        + "".join(f"<div><span>{i}</span></div>" for i in range(400))
+        + "</body></html>"
+    )
+    return pages
@@ -0,0 +1,264 @@
+"""Offline benchmarks for the service's hot paths.
+
+    python -m benchmarks.run                        # everything, results to stdout
+    python -m benchmarks.run --output bench.json    # save machine-readable results
+    python -m benchmarks.run --compare bench.json   # diff against a saved run
+
+Three groups are measured against the generated fixture corpus:
+
+* ``pdf.*``     PDF text extraction per fixture and profile, in process
+* ``parse.*``   JobScraper's HTML extraction per saved job page
+* ``http.*``    throughput of /parse-pdf and /scrape-job through the FastAPI
+                app under concurrency, with LinkedIn replaced by a local stub
+
+Every operation reports latency percentiles, throughput and the peak
+traced memory of a single call. Caches are disabled so repeated runs
+measure real work.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import fixtures
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def _summarize(samples, errors, wall_time, peak_memory=None):
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p90_ms": _percentile(samples, 0.90) * 1000,
+        "p99_ms": _percentile(samples, 0.99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+        "ops_per_sec": len(samples) / wall_time if wall_time else 0.0,
+        "peak_memory_bytes": peak_memory,
+    }
+
+def _measure(fn, iterations):
+    """Time ``fn`` serially, then trace one extra call for peak memory"""
+    samples, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - call_started)
+    wall_time = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        fn()
+    except Exception:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _summarize(samples, errors, wall_time, peak)
+
+def bench_pdf(iterations):
+    from app.services.pdf_service import EXTRACTION_PROFILES, _extract_pages
+
+    results = {}
+    for name, content in fixtures.resume_pdfs().items():
+        for profile in ("fast", "balanced"):
+            laparams = EXTRACTION_PROFILES[profile]
+
+            def extract():
+                # mirror PDFService's empty-text check so scans count as errors
+                if not _extract_pages(content, laparams).strip():
+                    raise ValueError("No text content extracted from PDF")
+
+            results[f"pdf.{name}.{profile}"] = _measure(extract, iterations)
+            results[f"pdf.{name}.{profile}"]["input_bytes"] = len(content)
+    return results
+
+def bench_parse(iterations):
+    from app.services.job_scraper import JobScraper
+
+    scraper = JobScraper()
+    results = {}
+    for name, html in fixtures.job_pages().items():
+        results[f"parse.{name}"] = _measure(lambda: scraper._parse_job_page(html), iterations)
+        results[f"parse.{name}"]["input_bytes"] = len(html.encode())
+    return results
+
+class _StubLinkedIn(BaseHTTPRequestHandler):
+    """Serves saved job pages by job ID: /jobs/view/<fixture name>-<n>"""
+    pages = {}
+
+    def do_GET(self):
+        name = self.path.rsplit("/", 1)[-1].split("-", 1)[0]
+        body = self.pages.get(name, "").encode()
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+async def _drive(client, make_request, total, concurrency):
+    samples, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(samples, errors, time.perf_counter() - started)
+
+async def _bench_http_async(requests, concurrency):
+    import httpx
+    from app.server.http_server import create_app
+
+    app = create_app()
+    pdfs = fixtures.resume_pdfs()
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            health_samples = []
+
+            async def probe_health():
+                # /health must stay responsive while PDFs are being parsed
+                while True:
+                    started = time.perf_counter()
+                    await client.get("/health")
+                    health_samples.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.05)
+
+            for name in ("small", "multi_page"):
+                async def parse_pdf(client, i, content=pdfs[name]):
+                    return await client.post("/parse-pdf", files={"file": ("resume.pdf", content, "application/pdf")})
+                # first call pays for starting the worker processes
+                await parse_pdf(client, 0)
+                prober = asyncio.ensure_future(probe_health())
+                results[f"http.parse_pdf.{name}"] = await _drive(client, parse_pdf, requests, concurrency)
+                prober.cancel()
+
+            results["http.health_under_pdf_load"] = _summarize(health_samples, 0, 0)
+
+            for name in ("primary", "keyword_fallback"):
+                # distinct IDs so concurrent requests aren't collapsed into one scrape
+                async def scrape_job(client, i, job_id=name):
+                    return await client.get("/scrape-job", params={"jobId": f"{job_id}-{i}"})
+                results[f"http.scrape_job.{name}"] = await _drive(client, scrape_job, requests, concurrency)
+    return results
+
+def bench_http(requests, concurrency):
+    _StubLinkedIn.pages = fixtures.job_pages()
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), _StubLinkedIn)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    # caches and outbound rate limiting would hide the work being measured
+    os.environ.update({
+        "SCRAPER_BASE_URL": f"http://127.0.0.1:{stub.server_address[1]}/jobs/view/",
+        "SCRAPER_RATE_LIMIT": "0",
+        "PDF_CACHE_ENTRIES": "0",
+        "PDF_CACHE_DIR": "",
+        "JOB_CACHE_ENTRIES": "0",
+    })
+    from app.config import get_settings
+    get_settings.cache_clear()
+    try:
+        return asyncio.run(_bench_http_async(requests, concurrency))
+    finally:
+        stub.shutdown()
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare(results, baseline, threshold):
+    """Print p50 deltas against the baseline; returns the names that regressed"""
+    regressions = []
+    print(f"{'operation':40} {'p50 ms':>10} {'base':>10} {'delta':>8}")
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None or not previous["p50_ms"]:
+            print(f"{name:40} {current['p50_ms']:10.2f} {'-':>10} {'new':>8}")
+            continue
+        delta = (current["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"]
+        flag = " !" if delta > threshold else ""
+        print(f"{name:40} {current['p50_ms']:10.2f} {previous['p50_ms']:10.2f} {delta:+8.1%}{flag}")
+        if delta > threshold:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", default="pdf,parse,http", help="comma separated: pdf,parse,http")
+    parser.add_argument("--iterations", type=int, default=10, help="serial calls per pdf/parse operation")
+    parser.add_argument("--requests", type=int, default=40, help="requests per http operation")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients for http operations")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    # the services log every request; keep the report readable
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    groups = set(args.groups.split(","))
+    results = {}
+    if "pdf" in groups:
+        results.update(bench_pdf(args.iterations))
+    if "parse" in groups:
+        results.update(bench_parse(args.iterations))
+    if "http" in groups:
+        results.update(bench_http(args.requests, args.concurrency))
+
+    report = {"metadata": _metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        return 1 if compare(results, baseline, args.threshold) else 0
+
+    if not args.output:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from app.server.compression import CompressionMiddleware, accepted_encodings
+
+BODY = b'{"skill": "Python"}\n' * 100
+
+def respond(*chunks: bytes, headers=()):
+    """ASGI app sending ``chunks`` as the response body"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json"), *headers]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+def call(app, accept_encoding: str = "gzip"):
+    """Run ``app`` behind the middleware; returns (headers, body chunks)"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=500)(scope, receive, send))
+    headers = {name.decode().lower(): value.decode() for name, value in messages[0]["headers"]}
+    return headers, [message["body"] for message in messages[1:]]
+
+def test_accepted_encodings_skip_refused_codings():
+    assert accepted_encodings("gzip;q=0, zstd, br; q=0.5, identity;q=0.0") == ["zstd", "br"]
+
+def test_large_bodies_are_gzipped():
+    headers, chunks = call(respond(BODY))
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(chunks[0])
+    assert gzip.decompress(chunks[0]) == BODY
+
+@pytest.mark.parametrize("body, encoding, accept_encoding", [
+    pytest.param(b"{}", None, "gzip", id="small"),
+    pytest.param(BODY, None, "br", id="unsupported"),
+    pytest.param(BODY, None, "gzip;q=0", id="refused"),
+    pytest.param(BODY, "br", "gzip", id="already-encoded"),
+])
+def test_bodies_pass_through_unchanged(body, encoding, accept_encoding):
+    response_headers = [(b"content-encoding", encoding.encode())] if encoding else []
+    headers, chunks = call(respond(body, headers=response_headers), accept_encoding)
+    assert headers.get("content-encoding") == encoding
+    assert chunks == [body]
+
+def test_streamed_chunks_are_flushed_as_they_arrive():
+    lines = [b'{"line": %d}\n' % i for i in range(3)]
+    headers, chunks = call(respond(*lines))
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # each chunk decodes to its line without waiting for the next one
+    assert [decoder.decompress(chunk) for chunk in chunks] == lines
+    assert decoder.eof
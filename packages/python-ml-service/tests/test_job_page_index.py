@@ -0,0 +1,102 @@
+import importlib.util
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.services.job_page_index import (
+    JobPageIndex,
+    JobPageScanner,
+    LOGO_CLASS_PATTERN,
+    LOGO_SELECTORS,
+    ORGANIZATION_SELECTORS,
+)
+from app.services.job_scraper import JobScraper
+from benchmarks.fixtures import job_pages
+
+DESCRIPTION_CLASS = "show-more-less-html__markup"
+DESCRIPTION_START = f'<div class="{DESCRIPTION_CLASS}">'
+
+PARSERS = [
+    "html.parser",
+    pytest.param("lxml", marks=pytest.mark.skipif(importlib.util.find_spec("lxml") is None, reason="lxml not installed")),
+]
+
+def _stray_end_tags(page: str, tags: str, after: str = "</p>") -> str:
+    """``page`` with ``tags`` inserted after the first ``after`` in the description"""
+    start = page.index(DESCRIPTION_START)
+    at = page.index(after, start) + len(after)
+    return page[:at] + tags + page[at:]
+
+PAGES = job_pages()
+PRIMARY = PAGES["primary"]
+# pages whose description is found by the primary selector
+PRIMARY_PAGES = {
+    "primary": PRIMARY,
+    # end tags with nothing of that name open are ignored
+    "stray_span": _stray_end_tags(PRIMARY, "</span></li></a>"),
+    # closes the description div right there
+    "stray_div": _stray_end_tags(PRIMARY, "</div>"),
+    # closes the enclosing section and the description with it
+    "stray_section": _stray_end_tags(PRIMARY, "</section>"),
+    "nested_div": _stray_end_tags(PRIMARY, "<div><p>nested</p><div>deeper</div></div>"),
+}
+# pages the scanner can't stop early on: a fallback has to search the
+# whole page, or the description's end tag only closes an inner div
+FULL_READ_PAGES = {
+    **{name: page for name, page in PAGES.items() if name != "primary"},
+    "unclosed_inner_div": _stray_end_tags(PRIMARY, "<div><p>never closed</p>", after=DESCRIPTION_START),
+}
+ALL_PAGES = {**PAGES, **PRIMARY_PAGES, **FULL_READ_PAGES}
+
+def complete_prefix(html: str, chunk_size: int = 512):
+    """The first chunk-aligned prefix the scanner calls complete, or None"""
+    scanner = JobPageScanner(DESCRIPTION_CLASS)
+    for end in range(chunk_size, len(html) + chunk_size, chunk_size):
+        scanner.feed(html[end - chunk_size:end])
+        if scanner.complete:
+            return html[:end]
+        if not scanner.possible:
+            return None
+    return None
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("name", sorted(PRIMARY_PAGES))
+def test_complete_prefix_parses_like_the_full_page(name, parser):
+    page = PRIMARY_PAGES[name]
+    scraper = JobScraper(parser=parser)
+    prefix = complete_prefix(page)
+    assert prefix is not None and len(prefix) < len(page)
+    assert scraper._parse_job_page(prefix) == scraper._parse_job_page(page)
+
+@pytest.mark.parametrize("name", sorted(FULL_READ_PAGES))
+def test_pages_without_a_closed_description_are_read_in_full(name):
+    assert complete_prefix(FULL_READ_PAGES[name]) is None
+
+def _job_description_div(tag):
+    classes = tag.get("class")
+    return (
+        tag.name == "div"
+        and classes
+        and any("job" in c.lower() for c in classes)
+        and any("description" in c.lower() for c in classes)
+    )
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("name", sorted(ALL_PAGES))
+def test_index_matches_find_and_select(name, parser):
+    soup = BeautifulSoup(ALL_PAGES[name], parser)
+    index = JobPageIndex(soup, DESCRIPTION_CLASS)
+
+    assert index.description is soup.find(class_=DESCRIPTION_CLASS)
+    for field, classes in ORGANIZATION_SELECTORS.items():
+        assert index.organization[field] is soup.select_one("." + ".".join(classes))
+    for selector, *_ in LOGO_SELECTORS:
+        assert index.logo_images[selector] is soup.select_one(selector)
+    assert index.logo_pattern_image is soup.find("img", attrs={"class": LOGO_CLASS_PATTERN})
+    assert index.job_description_div is soup.find(_job_description_div)
+    for keyword, string in index.keyword_strings.items():
+        assert string is soup.find(string=re.compile(keyword, re.IGNORECASE))
+    for tag in soup.find_all(["div", "section"]):
+        assert index.text_length(tag) == len(tag.get_text())
+        assert index.text_length(tag, strip=True) == len(tag.get_text(strip=True))
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from app.services.job_queue import (
+    CANCELLED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueueFullError,
+    JobScheduler,
+)
+from app.services.result_cache import ResultCache
+
+class Handler:
+    """Job handler that records what ran and holds each job until released"""
+
+    def __init__(self):
+        self.started = []
+        self.cleaned = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, payload):
+        self.started.append(payload)
+        await self.release.wait()
+        return {"payload": payload}
+
+    def cleanup(self, payload):
+        self.cleaned.append(payload)
+
+def scheduler_with(handler: Handler, **kwargs) -> JobScheduler:
+    scheduler = JobScheduler({"test": 1}, **kwargs)
+    scheduler.register("test", handler, cleanup=handler.cleanup)
+    return scheduler
+
+async def wait_for_status(scheduler: JobScheduler, job_id: str, *statuses: str) -> dict:
+    for _ in range(200):
+        record = await scheduler.get(job_id)
+        if record is not None and record["status"] in statuses:
+            return record
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+def test_higher_priority_jobs_start_first():
+    async def main():
+        handler = Handler()
+        scheduler = scheduler_with(handler)
+        first = await scheduler.submit("test", "first", {})
+        await wait_for_status(scheduler, first.id, RUNNING)
+        jobs = [await scheduler.submit("test", name, {}, priority=name) for name in ("low", "normal", "high")]
+        handler.release.set()
+        for job in jobs:
+            await wait_for_status(scheduler, job.id, SUCCEEDED)
+        await scheduler.close()
+        return handler.started
+
+    assert asyncio.run(main()) == ["first", "high", "normal", "low"]
+
+def test_cancelling_a_queued_job_cleans_it_up_without_running_it():
+    async def main():
+        handler = Handler()
+        scheduler = scheduler_with(handler)
+        first = await scheduler.submit("test", "first", {})
+        queued = await scheduler.submit("test", "queued", {})
+        record = await scheduler.cancel(queued.id)
+        handler.release.set()
+        await wait_for_status(scheduler, first.id, SUCCEEDED)
+        await scheduler.close()
+        return handler, record
+
+    handler, record = asyncio.run(main())
+    assert record["status"] == CANCELLED
+    assert handler.started == ["first"]
+    assert sorted(handler.cleaned) == ["first", "queued"]
+
+def test_cancelling_a_running_job_frees_its_slot():
+    async def main():
+        handler = Handler()
+        scheduler = scheduler_with(handler)
+        running = await scheduler.submit("test", "running", {})
+        queued = await scheduler.submit("test", "queued", {})
+        await wait_for_status(scheduler, running.id, RUNNING)
+        record = await scheduler.cancel(running.id)
+        await wait_for_status(scheduler, queued.id, RUNNING)
+        handler.release.set()
+        await wait_for_status(scheduler, queued.id, SUCCEEDED)
+        await scheduler.close()
+        return record
+
+    assert asyncio.run(main())["status"] == CANCELLED
+
+def test_queue_is_capped_by_count_and_bytes():
+    async def main():
+        handler = Handler()
+        scheduler = scheduler_with(handler, max_queued=1, max_queued_bytes=100)
+        await scheduler.submit("test", "running", {}, size=60)
+        # the running job's bytes no longer count as queued
+        await scheduler.submit("test", "queued", {}, size=60)
+        with pytest.raises(JobQueueFullError):
+            await scheduler.submit("test", "by count", {})
+        await scheduler.cancel(next(job.id for job in scheduler._jobs.values() if job.payload == "queued"))
+        with pytest.raises(JobQueueFullError):
+            await scheduler.submit("test", "by bytes", {}, size=101)
+        await scheduler.submit("test", "fits", {}, size=100)
+        await scheduler.close()
+
+    asyncio.run(main())
+
+def test_finished_jobs_expire():
+    async def main():
+        handler = Handler()
+        handler.release.set()
+        scheduler = scheduler_with(handler, result_ttl=0.05)
+        job = await scheduler.submit("test", "job", {})
+        await wait_for_status(scheduler, job.id, SUCCEEDED)
+        await asyncio.sleep(0.1)
+        return await scheduler.get(job.id)
+
+    assert asyncio.run(main()) is None
+
+def test_job_cancelled_through_another_worker_never_starts():
+    async def main():
+        store = ResultCache("jobs")
+        handler = Handler()
+        owner = scheduler_with(handler, store=store)
+        other = scheduler_with(Handler(), store=store)
+        first = await owner.submit("test", "first", {})
+        queued = await owner.submit("test", "queued", {})
+        record = await other.cancel(queued.id)
+        handler.release.set()
+        await wait_for_status(owner, queued.id, CANCELLED)
+        await owner.close()
+        return handler, record
+
+    handler, record = asyncio.run(main())
+    assert record["status"] == CANCELLED
+    assert handler.started == ["first"]
+
+def test_close_records_cancelled_jobs_in_the_store():
+    async def main():
+        store = ResultCache("jobs")
+        handler = Handler()
+        scheduler = scheduler_with(handler, store=store)
+        running = await scheduler.submit("test", "running", {})
+        queued = await scheduler.submit("test", "queued", {})
+        await wait_for_status(scheduler, running.id, RUNNING)
+        assert (await store.get(queued.id))["status"] == QUEUED
+        await scheduler.close()
+        return handler, [await store.get(job.id) for job in (running, queued)]
+
+    handler, records = asyncio.run(main())
+    assert [record["status"] for record in records] == [CANCELLED, CANCELLED]
+    assert sorted(handler.cleaned) == ["queued", "running"]
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.job_scraper import JobScraper
+from app.services.resilience import Deadline, DeadlineExceeded
+from benchmarks.fixtures import job_pages
+
+PAGE = job_pages()["primary"]
+
+def slow_scraper(delay: float):
+    """A JobScraper whose job pages take ``delay`` seconds to arrive"""
+    scraper = JobScraper(base_url="https://jobs.test/view/", max_retries=0)
+    scraper.requests = 0
+
+    async def handler(request):
+        scraper.requests += 1
+        await asyncio.sleep(delay)
+        return httpx.Response(200, text=PAGE)
+
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+def test_concurrent_scrapes_share_one_fetch():
+    async def main():
+        scraper = slow_scraper(0.2)
+        results = await asyncio.gather(*(scraper.scrape("1") for _ in range(5)))
+        return scraper, results
+
+    scraper, results = asyncio.run(main())
+    assert scraper.requests == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["organization"]["name"] == "Acme Corp"
+
+def test_shared_scrape_runs_until_the_latest_deadline():
+    async def main():
+        scraper = slow_scraper(0.5)
+        started = time.monotonic()
+
+        async def timed(deadline):
+            try:
+                return await scraper.scrape("1", deadline)
+            finally:
+                elapsed.append(time.monotonic() - started)
+
+        elapsed = []
+        results = await asyncio.gather(timed(Deadline(0.1)), timed(Deadline(5)), return_exceptions=True)
+        return scraper, results, elapsed
+
+    scraper, (short, long), elapsed = asyncio.run(main())
+    # the short caller gives up on time, without taking the shared fetch with it
+    assert isinstance(short, DeadlineExceeded)
+    assert min(elapsed) < 0.4
+    assert long["organization"]["name"] == "Acme Corp"
+    assert scraper.requests == 1
+
+def test_later_caller_extends_a_running_scrape():
+    async def main():
+        scraper = slow_scraper(0.5)
+        first = asyncio.ensure_future(scraper.scrape("1", Deadline(0.2)))
+        await asyncio.sleep(0.05)
+        second = await scraper.scrape("1", Deadline(5))
+        with pytest.raises(DeadlineExceeded):
+            await first
+        return scraper, second
+
+    scraper, second = asyncio.run(main())
+    assert second["organization"]["name"] == "Acme Corp"
+    assert scraper.requests == 1
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded
+
+def test_deadline_from_headers_is_clamped():
+    assert Deadline.from_headers({}, 5, 10).remaining() == pytest.approx(5, abs=0.1)
+    assert Deadline.from_headers({Deadline.HEADER: "2000"}, 5, 10).remaining() == pytest.approx(2, abs=0.1)
+    assert Deadline.from_headers({Deadline.HEADER: "60000"}, 5, 10).remaining() == pytest.approx(10, abs=0.1)
+    assert Deadline.from_headers({Deadline.HEADER: "-1"}, 5, 10).expired
+    assert Deadline.from_headers({Deadline.HEADER: "soon"}, 5, 10).remaining() == pytest.approx(5, abs=0.1)
+
+def test_deadline_caps_checks_and_waits():
+    deadline = Deadline(0.05)
+    assert deadline.cap(10) <= 0.05
+    deadline.check("starting")
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(deadline.wait(asyncio.sleep(1), "sleeping"))
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("continuing")
+    assert Deadline(None).cap(10) == 10
+
+def test_deadline_only_extends_forward():
+    deadline = Deadline(1)
+    deadline.extend(Deadline(0.1))
+    assert deadline.remaining() > 0.5
+    deadline.extend(Deadline(5))
+    assert deadline.remaining() > 4
+    deadline.extend(Deadline(None))
+    assert deadline.remaining() is None
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.allow()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.allow()
+    assert 0 < excinfo.value.retry_after <= 30
+    assert breaker.rejected == 1
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
+
+def test_unreported_trial_stops_blocking_after_reset_timeout():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    # the trial never reports back
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
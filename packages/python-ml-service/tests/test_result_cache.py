@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+
+from app.services.result_cache import ResultCache
+
+def test_memory_tier_evicts_least_recently_used():
+    async def main():
+        cache = ResultCache("test", max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        return [await cache.get(key) for key in "abc"], cache.stats()
+
+    values, stats = asyncio.run(main())
+    assert values == [1, None, 3]
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+def test_entries_expire():
+    async def main():
+        cache = ResultCache("test", ttl=0.05)
+        await cache.set("default", 1)
+        await cache.set("longer", 2, ttl=10)
+        await asyncio.sleep(0.1)
+        return await cache.get("default"), await cache.get("longer")
+
+    assert asyncio.run(main()) == (None, 2)
+
+def test_disk_tier_is_shared_and_survives_restarts(tmp_path):
+    async def main():
+        await ResultCache("test", disk_dir=str(tmp_path)).set("resume", {"text": "hello"})
+        reopened = ResultCache("test", disk_dir=str(tmp_path))
+        return await reopened.get("resume"), reopened.stats()
+
+    value, stats = asyncio.run(main())
+    assert value == {"text": "hello"}
+    assert stats["disk_hits"] == 1 and stats["disk_bytes"] > 0
+
+def test_unsafe_keys_stay_inside_the_cache_dir(tmp_path):
+    async def main():
+        cache = ResultCache("test", disk_dir=str(tmp_path / "cache"))
+        await cache.set("../../escape", 1)
+        return await ResultCache("test", disk_dir=str(tmp_path / "cache")).get("../../escape")
+
+    assert asyncio.run(main()) == 1
+    assert sorted(os.listdir(tmp_path)) == ["cache"]
+
+def test_unreadable_entries_are_dropped(tmp_path):
+    async def main():
+        cache = ResultCache("test", disk_dir=str(tmp_path))
+        await cache.set("key", 1)
+        with open(cache._disk_path("key"), "w") as f:
+            f.write("{not json")
+        return await ResultCache("test", disk_dir=str(tmp_path)).get("key"), cache._disk_path("key")
+
+    value, path = asyncio.run(main())
+    assert value is None
+    assert not os.path.exists(path)
+
+def test_disk_tier_is_pruned_oldest_first(tmp_path):
+    async def main():
+        cache = ResultCache("test", disk_dir=str(tmp_path), disk_max_bytes=300)
+        for i in range(5):
+            await cache.set(f"key{i}", "x" * 50)
+            # distinct mtimes, all older than the next write, so the
+            # pruning order doesn't depend on the clock's resolution
+            past = time.time() - 100 + i
+            os.utime(cache._disk_path(f"key{i}"), (past, past))
+        reopened = ResultCache("test", disk_dir=str(tmp_path))
+        return cache, [await reopened.get(f"key{i}") for i in range(5)]
+
+    cache, values = asyncio.run(main())
+    assert values[0] is None and values[-1] == "x" * 50
+    assert cache.stats()["disk_bytes"] <= 300
@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.skill_extractor import SkillExtractor
+
+@pytest.fixture(scope="module")
+def extractor():
+    return SkillExtractor()
+
+def skills(extractor, text):
+    return [match["skill"] for match in extractor.extract(text)["skills"]]
+
+@pytest.mark.parametrize("text", [
+    "We value the rest of the team … Spark of creativity",
+    "Keep your savings in a vault. Bring celery sticks and a bash on Friday! Go home early.",
+    "We react fast, jest a lot and never let our skills rust.",
+    "Listen first. React to feedback with care. Swift of foot, we move fast.",
+])
+def test_prose_yields_no_skills(extractor, text):
+    assert skills(extractor, text) == []
+
+def test_skill_names_still_match(extractor):
+    text = "Experience with Spark, Vault, REST APIs, Go and React.\nCelery\nRust"
+    assert sorted(skills(extractor, text)) == ["Celery", "Go", "REST", "React", "Rust", "Spark", "Vault"]
+
+@pytest.mark.parametrize("text, expected", [
+    ("We use Python. React and Redux are a plus.", ["Python", "React", "Redux"]),
+    ("Mostly backend work. Rust or Go experience preferred.", ["Go", "Rust"]),
+    ("REST APIs. Jest tests.", ["Jest", "REST"]),
+    ("Our stack is Python. Spark jobs run nightly. Celery handles the rest.", ["Celery", "Python", "Spark"]),
+    ("Build data pipelines. Go to production weekly.", []),
+])
+def test_skills_opening_a_sentence(extractor, text, expected):
+    assert sorted(skills(extractor, text)) == expected
+
+def test_names_glued_to_other_characters_do_not_match(extractor):
+    assert skills(extractor, "Google R&D") == []
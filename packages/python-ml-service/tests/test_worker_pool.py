@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.worker_pool import PoolSaturatedError, WorkerPool
+
+# generous: every recycled worker is a fresh spawned interpreter
+TIMEOUT = 60
+
+def run_all(pool: WorkerPool, calls):
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*(pool.run(fn, *args, wait=True) for fn, *args in calls)),
+            TIMEOUT,
+        )
+    try:
+        return asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+def test_recycled_workers_keep_serving_queued_tasks():
+    pool = WorkerPool("test", 2, 50, max_tasks_per_child=2)
+    # more tasks than the first generation of workers can take
+    results = run_all(pool, [(pow, i, 2) for i in range(12)])
+    assert results == [i * i for i in range(12)]
+    assert pool.in_flight == 0
+
+def test_workers_over_max_rss_retire_after_their_task():
+    pool = WorkerPool("test", 2, 50, max_rss=1)
+    pids = run_all(pool, [(os.getpid,)] * 6)
+    assert len(set(pids)) == 6
+    assert pool.in_flight == 0
+
+def test_full_pool_rejects_unless_waiting():
+    pool = WorkerPool("test", 1, 0)
+
+    async def main():
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(pow, 2, 2)
+        waited = await pool.run(pow, 2, 3, wait=True)
+        await busy
+        return waited
+
+    try:
+        assert asyncio.run(main()) == 8
+    finally:
+        pool.shutdown()
+    assert pool.in_flight == 0
+
+def test_broken_pool_is_replaced():
+    pool = WorkerPool("test", 1, 4)
+
+    async def main():
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(os._exit, 1)
+        return await pool.run(pow, 3, 3)
+
+    try:
+        assert asyncio.run(main()) == 27
+    finally:
+        pool.shutdown()
+    assert pool.in_flight == 0